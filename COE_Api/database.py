@@ -1,8 +1,11 @@
 # database.py
 import os
+import threading
+import time
 import psycopg2
 from psycopg2 import pool
 from psycopg2.extras import RealDictCursor
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from typing import Optional, Dict, List, Any
 from dotenv import load_dotenv
@@ -10,6 +13,19 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+class DeferredConnectionPool(pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool that opens no connections in its constructor.
+    
+    psycopg2 uses ``minconn`` both for the connections the constructor opens
+    and for how many idle connections putconn keeps. Here it only means the
+    latter: connections are opened on first use or by prewarm, so creating
+    the pool never waits on Postgres.
+    """
+    
+    def __init__(self, minconn: int, maxconn: int, *args, **kwargs):
+        super().__init__(0, maxconn, *args, **kwargs)
+        self.minconn = min(int(minconn), self.maxconn)
+
 class DatabaseManager:
     """Database manager using psycopg2 connection pooling"""
     
@@ -17,23 +33,61 @@ class DatabaseManager:
         self.pool = None
         self._init_pool()
     
+    @staticmethod
+    def connection_params() -> Dict[str, Any]:
+        return {
+            "host": os.getenv("DB_HOST", "localhost"),
+            "port": int(os.getenv("DB_PORT", 5432)),
+            "database": os.getenv("DB_NAME", "blogpost_db"),
+            "user": os.getenv("DB_USER", "postgres"),
+            "password": os.getenv("DB_PASSWORD", "rishi1023"),
+            "cursor_factory": RealDictCursor,
+        }
+    
+    def connect(self):
+        """A connection outside the pool, for callers that must not queue for it"""
+        return psycopg2.connect(**self.connection_params())
+    
     def _init_pool(self):
-        """Initialize the connection pool"""
+        """Create the connection pool without opening any connections.
+
+        Connections are opened on first use (or by prewarm()); up to
+        DB_POOL_MIN of them, or DB_POOL_PREWARM if larger, are then kept
+        idle for reuse.
+        """
         try:
-            self.pool = psycopg2.pool.SimpleConnectionPool(
-                1, 20,  # min and max connections
-                host=os.getenv("DB_HOST", "localhost"),
-                port=int(os.getenv("DB_PORT", 5432)),
-                database=os.getenv("DB_NAME", "blogpost_db"),
-                user=os.getenv("DB_USER", "postgres"),
-                password=os.getenv("DB_PASSWORD", "rishi1023"),
-                cursor_factory=RealDictCursor
-            )
-            print("Database connection pool initialized successfully")
+            max_connections = int(os.getenv("DB_POOL_MAX", 20))
+            # Connections opened in parallel at startup; 0 opens them on demand
+            self.prewarm_count = min(int(os.getenv("DB_POOL_PREWARM", 0)), max_connections)
+            idle = max(int(os.getenv("DB_POOL_MIN", 1)), self.prewarm_count)
+            # Threaded pool: sync endpoints, the view counter flush and prewarm share it across threads
+            self.pool = DeferredConnectionPool(idle, max_connections, **self.connection_params())
+            print("Database connection pool created (connections open on first use)")
         except Exception as e:
             print(f"Failed to create database pool: {e}")
             raise e
     
+    def prewarm(self, connections: Optional[int] = None) -> int:
+        """Open ``connections`` (default DB_POOL_PREWARM, at most DB_POOL_MAX) idle
+        connections in parallel and return how many were opened"""
+        count = min(self.prewarm_count if connections is None else connections, self.pool.maxconn)
+        if count <= 0:
+            return 0
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            opened = [
+                conn for conn in executor.map(lambda _: self._try_getconn(), range(count)) if conn is not None
+            ]
+        for conn in opened:
+            self.pool.putconn(conn)
+        return len(opened)
+    
+    def _try_getconn(self):
+        try:
+            return self.pool.getconn()
+        except Exception as e:
+            print(f"Pool prewarm connection failed: {e}")
+            return None
+    
     @contextmanager
     def get_connection(self):
         """Context manager for database connections"""
@@ -79,6 +133,22 @@ class DatabaseManager:
                 cursor.execute(query, params)
                 return cursor.rowcount
     
+    def pool_state(self) -> Dict[str, Any]:
+        """Connection counts from the pool's own bookkeeping; no database access.
+
+        psycopg2's pools have no public API for their counts, so this reads
+        the private ``_used``/``_pool`` attributes of AbstractConnectionPool
+        (stable since psycopg2 2.0). Should they disappear, only the counts
+        are dropped from the report.
+        """
+        if self.pool is None:
+            return {"initialized": False}
+        state = {"closed": self.pool.closed, "max": self.pool.maxconn}
+        used, idle = getattr(self.pool, "_used", None), getattr(self.pool, "_pool", None)
+        if used is not None and idle is not None:
+            state.update(in_use=len(used), idle=len(idle), available=self.pool.maxconn - len(used))
+        return state
+
     def close_pool(self):
         """Close all connections in the pool"""
         if self.pool:
@@ -89,6 +159,12 @@ db_manager = DatabaseManager()
 
 # Database operations for different modules
 
+# Everything a blog listing needs except the full content
+BLOG_LIST_COLUMNS = """
+    b.id, b.title, b.author_name, b.domain_id, b.status, b.created_at, b.updated_at,
+    b.excerpt, b.word_count, b.reading_time_minutes, d.name AS domain_name
+"""
+
 class BlogsDB:
     """Database operations for blogs"""
     
@@ -150,11 +226,12 @@ class BlogsDB:
             return None
     
     @staticmethod
-    def get_blogs(domain_name: Optional[str] = None, search: Optional[str] = None) -> List[Dict[str, Any]]:
+    def get_blogs(domain_name: Optional[str] = None, search: Optional[str] = None,
+                  status: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all blogs with optional filtering"""
         try:
-            query = """
-                SELECT b.*, d.name AS domain_name
+            query = f"""
+                SELECT {BLOG_LIST_COLUMNS}
                 FROM blogs b
                 JOIN domains d ON b.domain_id = d.id
                 WHERE 1=1
@@ -165,7 +242,12 @@ class BlogsDB:
                 query += " AND d.name = %s"
                 params.append(domain_name)
             
+            if status:
+                query += " AND b.status = %s"
+                params.append(status)
+            
             if search:
+                # Served by the trigram indexes; only matching bodies are read
                 query += " AND (b.title ILIKE %s OR b.content ILIKE %s)"
                 params.extend([f"%{search}%", f"%{search}%"])
             
@@ -193,45 +275,320 @@ class BlogsDB:
             print(f"Error getting blog by ID: {str(e)}")
             return None
     
+    # Columns a partial blog update may set directly
+    PATCHABLE_FIELDS = ("title", "content", "author_name")
+
+    @staticmethod
+    def update_blog(blog_id: int, fields: Dict[str, Any]) -> tuple:
+        """Apply a partial update in one statement and return (outcome, blog).
+
+        ``fields`` holds only the supplied values; domain_name is resolved
+        (and created if missing) inside the same statement. outcome is
+        'updated', 'not_found' or 'not_pending' (only pending blogs are
+        editable); blog is the updated row joined with its domain name.
+        """
+        params = {"blog_id": blog_id}
+        assignments = []
+        for column in BlogsDB.PATCHABLE_FIELDS:
+            if column in fields:
+                assignments.append(f"{column} = %({column})s")
+                params[column] = fields[column]
+
+        ctes = []
+        if "domain_name" in fields:
+            params["domain_name"] = fields["domain_name"]
+            # The insert only runs for an editable blog and a domain this
+            # snapshot cannot see. If a concurrent transaction created it in
+            # the meantime, DO UPDATE waits for it and still returns the id
+            # (DO NOTHING would return no row and leave domain_id NULL).
+            ctes.append("""
+                new_domain AS (
+                    INSERT INTO domains (name)
+                    SELECT %(domain_name)s
+                    WHERE EXISTS (SELECT 1 FROM blogs WHERE id = %(blog_id)s AND status = 'pending')
+                      AND NOT EXISTS (SELECT 1 FROM domains WHERE name = %(domain_name)s)
+                    ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+                    RETURNING id
+                ),
+                domain AS (
+                    SELECT id FROM domains WHERE name = %(domain_name)s
+                    UNION ALL
+                    SELECT id FROM new_domain
+                    LIMIT 1
+                )""")
+            assignments.append("domain_id = (SELECT id FROM domain)")
+            domain_name = "%(domain_name)s::varchar"
+            domain_join = ""
+        else:
+            domain_name = "d.name"
+            domain_join = "LEFT JOIN domains d ON d.id = u.domain_id"
+        assignments.append("updated_at = CURRENT_TIMESTAMP")
+
+        ctes.append(f"""
+                updated AS (
+                    UPDATE blogs SET {', '.join(assignments)}
+                    WHERE id = %(blog_id)s AND status = 'pending'
+                    RETURNING *
+                )""")
+        # current_status comes from the statement snapshot, i.e. before the update
+        row = db_manager.execute_single(f"""
+            WITH {','.join(ctes)}
+            SELECT u.*, {domain_name} AS domain_name,
+                   (SELECT status FROM blogs WHERE id = %(blog_id)s) AS current_status
+            FROM (SELECT 1) AS one
+            LEFT JOIN updated u ON true
+            {domain_join};
+        """, params)
+
+        current_status = row.pop("current_status")
+        if current_status is None:
+            return "not_found", None
+        if row["id"] is None:
+            return "not_pending", None
+        return "updated", row
+    
     @staticmethod
-    def update_blog(blog_id: int, title: str, content: str, author_name: str, domain_name: str) -> Optional[Dict[str, Any]]:
-        """Update a blog"""
+    def delete_blog(blog_id: int) -> bool:
+        """Delete a blog"""
         try:
-            domain_id = BlogsDB.get_or_create_domain(domain_name)
-            if domain_id is None:
-                raise Exception("Domain creation failed")
-            
-            # Update blog
             affected_rows = db_manager.execute_update(
+                "DELETE FROM blogs WHERE id = %s;",
+                (blog_id,)
+            )
+            return affected_rows > 0
+        except Exception as e:
+            print(f"Error deleting blog: {str(e)}")
+            return False
+
+class BlogViewsDB:
+    """View/read counters and the decayed trending score per blog"""
+    
+    @staticmethod
+    def add_counts(counts: Dict[int, List[int]], read_weight: float, half_life_seconds: float) -> bool:
+        """Upsert buffered {blog_id: [views, reads]} increments in one statement.
+
+        The stored score is decayed to now before the new activity is added.
+        Ids of blogs deleted in the meantime are dropped by the join.
+        """
+        try:
+            # Sorted ids keep concurrent flushes from different workers lock-ordered
+            blog_ids = sorted(counts)
+            db_manager.execute_update(
                 """
-                UPDATE blogs 
-                SET title = %s, content = %s, author_name = %s, domain_id = %s, updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s AND status = 'pending';
+                INSERT INTO blog_view_counts (blog_id, views, reads, trending_score, score_updated_at)
+                SELECT v.blog_id, v.views, v.reads, v.views + %(read_weight)s * v.reads, CURRENT_TIMESTAMP
+                FROM unnest(%(ids)s::int[], %(views)s::bigint[], %(reads)s::bigint[]) AS v(blog_id, views, reads)
+                JOIN blogs b ON b.id = v.blog_id
+                ORDER BY v.blog_id
+                ON CONFLICT (blog_id) DO UPDATE SET
+                    views = blog_view_counts.views + EXCLUDED.views,
+                    reads = blog_view_counts.reads + EXCLUDED.reads,
+                    trending_score = blog_view_counts.trending_score * power(0.5,
+                        EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - blog_view_counts.score_updated_at)) / %(half_life)s
+                    ) + EXCLUDED.trending_score,
+                    score_updated_at = CURRENT_TIMESTAMP;
                 """,
-                (title, content, author_name, domain_id, blog_id)
+                {
+                    "ids": blog_ids,
+                    "views": [counts[blog_id][0] for blog_id in blog_ids],
+                    "reads": [counts[blog_id][1] for blog_id in blog_ids],
+                    "read_weight": read_weight,
+                    "half_life": half_life_seconds,
+                }
             )
+            return True
+        except Exception as e:
+            print(f"Error flushing blog view counts: {str(e)}")
+            return False
+    
+    @staticmethod
+    def get_trending(limit: int, half_life_seconds: float, domain_name: Optional[str] = None,
+                     status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Blogs ordered by trending score decayed to now.
+
+        Scores untouched for ten half-lives have decayed below 0.1% of their
+        value and are skipped via the score_updated_at index.
+        """
+        try:
+            query = f"""
+                SELECT {BLOG_LIST_COLUMNS}, c.views, c.reads,
+                       c.trending_score * power(0.5,
+                           EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - c.score_updated_at)) / %(half_life)s
+                       ) AS trending_score
+                FROM blog_view_counts c
+                JOIN blogs b ON b.id = c.blog_id
+                JOIN domains d ON b.domain_id = d.id
+                WHERE c.score_updated_at > CURRENT_TIMESTAMP - make_interval(secs => 10 * %(half_life)s)
+            """
+            params = {"half_life": half_life_seconds, "limit": limit}
+            
+            if domain_name:
+                query += " AND d.name = %(domain_name)s"
+                params["domain_name"] = domain_name
             
-            if affected_rows == 0:
-                return None
+            if status:
+                query += " AND b.status = %(status)s"
+                params["status"] = status
             
-            # Return updated blog
-            return BlogsDB.get_blog_by_id(blog_id)
+            query += " ORDER BY trending_score DESC, b.id LIMIT %(limit)s;"
+            
+            return db_manager.execute_query(query, params)
+        except Exception as e:
+            print(f"Error getting trending blogs: {str(e)}")
+            return []
+
+class ModerationDB:
+    """Moderation queue over blogs.status; claims are leases that expire after claim_ttl seconds"""
+    
+    @staticmethod
+    def claim_blogs(moderator: str, limit: int, claim_ttl: int) -> List[Dict[str, Any]]:
+        """Claim up to ``limit`` of the oldest unclaimed pending blogs for ``moderator``.
+
+        Rows locked by a concurrent claim are skipped rather than waited on,
+        so moderators claiming at the same time get disjoint batches. Blogs
+        the moderator already holds are returned again.
+        """
+        try:
+            return db_manager.execute_query(
+                """
+                WITH claimed AS (
+                    UPDATE blogs b
+                    SET claimed_by = %(moderator)s, claimed_at = CURRENT_TIMESTAMP
+                    FROM (
+                        SELECT id FROM blogs
+                        WHERE status = 'pending'
+                          AND (claimed_at IS NULL
+                               OR claimed_by = %(moderator)s
+                               OR claimed_at < CURRENT_TIMESTAMP - make_interval(secs => %(ttl)s))
+                        ORDER BY created_at, id
+                        LIMIT %(limit)s
+                        FOR UPDATE SKIP LOCKED
+                    ) next
+                    WHERE b.id = next.id
+                    RETURNING b.*
+                )
+                SELECT c.*, d.name AS domain_name
+                FROM claimed c
+                LEFT JOIN domains d ON c.domain_id = d.id
+                ORDER BY c.created_at, c.id;
+                """,
+                {"moderator": moderator, "limit": limit, "ttl": claim_ttl}
+            )
+        except Exception as e:
+            print(f"Error claiming blogs: {str(e)}")
+            return []
+    
+    @staticmethod
+    def decide_blogs(blog_ids: List[int], status: str, moderator: str, claim_ttl: int) -> Optional[List[int]]:
+        """Set ``status`` on the given pending blogs and return the ids that changed.
+
+        Blogs that are not pending, or are claimed by another moderator
+        whose claim has not expired, are left untouched.
+        """
+        try:
+            rows = db_manager.execute_query(
+                """
+                UPDATE blogs
+                SET status = %(status)s, reviewed_by = %(moderator)s, reviewed_at = CURRENT_TIMESTAMP,
+                    claimed_by = NULL, claimed_at = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ANY(%(ids)s) AND status = 'pending'
+                  AND (claimed_by IS NULL
+                       OR claimed_by = %(moderator)s
+                       OR claimed_at < CURRENT_TIMESTAMP - make_interval(secs => %(ttl)s))
+                RETURNING id;
+                """,
+                {"status": status, "moderator": moderator, "ids": blog_ids, "ttl": claim_ttl}
+            )
+            return [row["id"] for row in rows]
         except Exception as e:
-            print(f"Error updating blog: {str(e)}")
+            print(f"Error updating blog statuses: {str(e)}")
             return None
     
     @staticmethod
-    def delete_blog(blog_id: int) -> bool:
-        """Delete a blog"""
+    def release_blogs(blog_ids: List[int], moderator: str) -> List[int]:
+        """Hand the moderator's claimed blogs back to the queue"""
         try:
-            affected_rows = db_manager.execute_update(
-                "DELETE FROM blogs WHERE id = %s;",
-                (blog_id,)
+            rows = db_manager.execute_query(
+                """
+                UPDATE blogs SET claimed_by = NULL, claimed_at = NULL
+                WHERE id = ANY(%s) AND status = 'pending' AND claimed_by = %s
+                RETURNING id;
+                """,
+                (blog_ids, moderator)
             )
-            return affected_rows > 0
+            return [row["id"] for row in rows]
         except Exception as e:
-            print(f"Error deleting blog: {str(e)}")
-            return False
+            print(f"Error releasing blogs: {str(e)}")
+            return []
+    
+    # (expires_at, {status: count}) from the planner statistics, shared by all requests
+    _status_estimate = (0.0, None)
+    _status_estimate_lock = threading.Lock()
+    
+    @staticmethod
+    def estimate_status_counts(ttl: float) -> Dict[str, int]:
+        """Approximate blogs per status from pg_stats, cached for ``ttl`` seconds.
+        
+        The most-common-values list of blogs.status (refreshed by ANALYZE or
+        autovacuum) times the table's row estimate: no scan of blogs and no
+        counter row for writers to contend on.
+        """
+        with ModerationDB._status_estimate_lock:
+            expires_at, counts = ModerationDB._status_estimate
+            if counts is not None and time.monotonic() < expires_at:
+                return counts
+        
+        rows = db_manager.execute_query(
+            """
+            SELECT v.status, ROUND(v.freq * GREATEST(c.reltuples, 0))::BIGINT AS count
+            FROM pg_class c
+            JOIN pg_stats s ON s.schemaname = 'public' AND s.tablename = 'blogs' AND s.attname = 'status'
+            CROSS JOIN LATERAL (
+                SELECT * FROM unnest(s.most_common_vals::TEXT::TEXT[], s.most_common_freqs)
+                UNION ALL
+                SELECT 'none', s.null_frac
+            ) v(status, freq)
+            WHERE c.oid = 'blogs'::regclass;
+            """
+        )
+        counts = {row["status"]: row["count"] for row in rows if row["count"] > 0}
+        with ModerationDB._status_estimate_lock:
+            ModerationDB._status_estimate = (time.monotonic() + ttl, counts)
+        return counts
+    
+    @staticmethod
+    def get_status_counts(claim_ttl: int, estimate_ttl: float) -> Optional[Dict[str, Any]]:
+        """Blog counts per status, plus how many pending blogs are currently claimed.
+        
+        The pending and claimed counts are exact and only walk pending rows,
+        through the idx_blogs_pending_queue partial index. The other statuses
+        are planner estimates (``estimate_status_counts``).
+        """
+        try:
+            row = db_manager.execute_single(
+                """
+                SELECT COUNT(*) AS pending,
+                       COUNT(*) FILTER (
+                           WHERE claimed_by IS NOT NULL
+                             AND claimed_at >= CURRENT_TIMESTAMP - make_interval(secs => %s)
+                       ) AS pending_claimed
+                FROM blogs WHERE status = 'pending';
+                """,
+                (claim_ttl,)
+            )
+            counts = dict(ModerationDB.estimate_status_counts(estimate_ttl))
+            counts.pop("pending", None)
+            estimated = sorted(counts)
+            if row["pending"]:
+                counts["pending"] = row["pending"]
+            return {
+                "counts": dict(sorted(counts.items())),
+                "pending_claimed": row["pending_claimed"],
+                "estimated": estimated,
+            }
+        except Exception as e:
+            print(f"Error getting blog status counts: {str(e)}")
+            return None
 
 class DomainsDB:
     """Database operations for domains"""
@@ -273,44 +630,73 @@ class EventsDB:
     """Database operations for events"""
     
     @staticmethod
-    def create_event(title: str, description: str, event_date: str, event_type: str, domain_id: int) -> Optional[Dict[str, Any]]:
-        """Create a new event"""
+    def create_event(title: str, description: str, event_date: str, event_type: str, domain_id: int,
+                     capacity: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Create a new event (capacity None means unlimited)"""
         try:
             return db_manager.execute_insert(
                 """
-                INSERT INTO events (title, description, event_date, event_type, domain_id)
-                VALUES (%s, %s, %s, %s, %s) RETURNING *;
+                INSERT INTO events (title, description, event_date, event_type, domain_id, capacity)
+                VALUES (%s, %s, %s, %s, %s, %s) RETURNING *;
                 """,
-                (title, description, event_date, event_type, domain_id)
+                (title, description, event_date, event_type, domain_id, capacity)
             )
         except Exception as e:
             print(f"Error creating event: {str(e)}")
             return None
     
     @staticmethod
-    def get_events(domain_name: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get all events with optional domain filtering"""
+    def get_events(domain_name: Optional[str] = None, date_from: Optional[str] = None,
+                   date_to: Optional[str] = None, event_type: Optional[str] = None,
+                   upcoming: bool = False, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Get events with optional domain, date range and type filtering.
+
+        Upcoming events (from today on) are returned soonest first, others
+        latest first. The domain is resolved to its id up front so the
+        (domain_id, event_date) index serves the range and the ordering.
+        """
         try:
+            query = """
+                SELECT e.*, d.name AS domain_name
+                FROM events e
+                JOIN domains d ON e.domain_id = d.id
+                WHERE 1=1
+            """
+            params = []
+            
             if domain_name:
-                return db_manager.execute_query(
-                    """
-                    SELECT e.*, d.name AS domain_name
-                    FROM events e
-                    JOIN domains d ON e.domain_id = d.id
-                    WHERE d.name = %s
-                    ORDER BY e.event_date DESC;
-                    """,
-                    (domain_name,)
-                )
+                query += " AND e.domain_id = (SELECT id FROM domains WHERE name = %s)"
+                params.append(domain_name)
+            
+            if upcoming:
+                query += " AND e.event_date >= CURRENT_DATE"
+            
+            if date_from:
+                query += " AND e.event_date >= %s"
+                params.append(date_from)
+            
+            if date_to:
+                query += " AND e.event_date <= %s"
+                params.append(date_to)
+            
+            if event_type:
+                query += " AND e.event_type = %s"
+                params.append(event_type)
+            
+            if upcoming:
+                query += " ORDER BY e.event_date ASC, e.id ASC"
             else:
-                return db_manager.execute_query(
-                    """
-                    SELECT e.*, d.name AS domain_name
-                    FROM events e
-                    JOIN domains d ON e.domain_id = d.id
-                    ORDER BY e.event_date DESC;
-                    """
-                )
+                query += " ORDER BY e.event_date DESC, e.id DESC"
+            
+            if limit is not None:
+                query += " LIMIT %s"
+                params.append(limit)
+            
+            if offset:
+                query += " OFFSET %s"
+                params.append(offset)
+            
+            return db_manager.execute_query(query + ";", tuple(params))
         except Exception as e:
             print(f"Error getting events: {str(e)}")
             return []
@@ -336,19 +722,47 @@ class EventRegistrationsDB:
     """Database operations for event registrations"""
     
     @staticmethod
-    def create_registration(event_id: int, user_name: str, email: str) -> Optional[Dict[str, Any]]:
-        """Create a new event registration"""
+    def create_registration(event_id: int, user_name: str, email: str) -> tuple:
+        """Register for an event and return (outcome, registration).
+
+        The seat is taken by a conditional increment of the event's
+        registration_count in the same statement as the insert, so
+        concurrent registrations cannot overfill it. outcome is
+        'registered', 'not_found', 'full' or 'invalid' (input the table's
+        constraints reject, e.g. a name or email over 100 characters; the
+        second element is then the database's message).
+        """
         try:
-            return db_manager.execute_insert(
+            row = db_manager.execute_single(
                 """
-                INSERT INTO event_registrations (event_id, user_name, email)
-                VALUES (%s, %s, %s) RETURNING *;
+                WITH seat AS (
+                    UPDATE events SET registration_count = registration_count + 1
+                    WHERE id = %(event_id)s AND (capacity IS NULL OR registration_count < capacity)
+                    RETURNING id, registration_count, capacity
+                ),
+                registered AS (
+                    INSERT INTO event_registrations (event_id, user_name, email)
+                    SELECT id, %(user_name)s, %(email)s FROM seat
+                    RETURNING *
+                )
+                SELECT r.*, s.registration_count, s.capacity,
+                       EXISTS (SELECT 1 FROM events WHERE id = %(event_id)s) AS event_exists
+                FROM (SELECT 1) AS one
+                LEFT JOIN registered r ON true
+                LEFT JOIN seat s ON true;
                 """,
-                (event_id, user_name, email)
+                {"event_id": event_id, "user_name": user_name, "email": email}
             )
-        except Exception as e:
-            print(f"Error creating registration: {str(e)}")
-            return None
+        except (psycopg2.DataError, psycopg2.IntegrityError) as e:
+            print(f"Registration rejected for event {event_id}: {str(e)}")
+            return "invalid", (e.diag.message_primary or str(e)).strip()
+        
+        event_exists = row.pop("event_exists")
+        if not event_exists:
+            return "not_found", None
+        if row["id"] is None:
+            return "full", None
+        return "registered", row
     
     @staticmethod
     def get_registrations_by_event(event_id: int) -> List[Dict[str, Any]]:
@@ -368,6 +782,40 @@ class EventRegistrationsDB:
             print(f"Error getting registrations: {str(e)}")
             return []
 
+class ChangeCountersDB:
+    """Version markers maintained by the change_counters triggers"""
+    
+    @staticmethod
+    def get_versions(tables: List[str], with_date: bool = False) -> Optional[List[Any]]:
+        """Current versions for tables (0 if never written), None if unavailable.
+        
+        with_date appends the database's CURRENT_DATE, read in the same query,
+        for lists whose contents depend on it.
+        """
+        try:
+            # A table's version is the sum of its shard rows. The outer row
+            # keeps CURRENT_DATE even when no counter exists yet.
+            rows = db_manager.execute_query(
+                """
+                SELECT CURRENT_DATE AS today, c.table_name, c.version
+                FROM (SELECT 1) one
+                LEFT JOIN (
+                    SELECT table_name, SUM(version)::BIGINT AS version
+                    FROM change_counters WHERE table_name = ANY(%s)
+                    GROUP BY table_name
+                ) c ON TRUE;
+                """,
+                (list(tables),)
+            )
+            versions = {row["table_name"]: row["version"] for row in rows if row["table_name"]}
+            result = [versions.get(table, 0) for table in tables]
+            if with_date:
+                result.append(rows[0]["today"])
+            return result
+        except Exception as e:
+            print(f"Error getting change counters: {str(e)}")
+            return None
+
 class AdminDB:
     """Database operations for admin functions"""
     
@@ -0,0 +1,180 @@
+"""Deduplicated, rate-limited logging for the exception handlers.
+
+Errors are grouped by fingerprint: the exception type and the innermost
+traceback frames for unhandled exceptions, or the status code, route and
+detail for HTTP errors. The first occurrence of a fingerprint is logged in
+full; repeats only increment a counter, and a one-line summary with the
+repeat count is written at most once per ``summary_interval`` seconds. A
+global budget caps how many first occurrences are logged per interval, so
+a storm of distinct errors cannot flood the log files either.
+
+The per-fingerprint table is kept in memory, bounded to ``max_entries``
+(least recently seen entries are dropped) and served by /admin/errors.
+"""
+import hashlib
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+
+from fastapi import Request
+
+
+def route_path(request: Request) -> str:
+    """The matched route template (e.g. /blogs/{blog_id}) rather than the raw URL"""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or request.url.path
+
+
+class ErrorLog:
+    def __init__(self, logger, max_entries: int = 500, summary_interval: float = 60,
+                 max_full_logs_per_interval: int = 20, frames: int = 3):
+        self.logger = logger
+        self.max_entries = max_entries
+        self.summary_interval = summary_interval
+        self.max_full_logs_per_interval = max_full_logs_per_interval
+        self.frames = frames
+        self.entries = OrderedDict()
+        self.totals = {"exceptions": 0, "http_errors": 0, "suppressed": 0, "evicted": 0}
+        self._window_started = time.monotonic()
+        self._window_full_logs = 0
+        self._lock = threading.Lock()
+
+    def exception_fingerprint(self, exc: BaseException, route: str) -> str:
+        frames = traceback.extract_tb(exc.__traceback__)[-self.frames:]
+        where = "|".join(f"{frame.filename}:{frame.name}:{frame.lineno}" for frame in frames)
+        return self._digest(type(exc).__name__, where, route)
+
+    @staticmethod
+    def _digest(*parts) -> str:
+        return hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:16]
+
+    def _entry(self, fingerprint: str, **fields) -> dict:
+        """Fetch or create the table entry for ``fingerprint``; caller holds the lock"""
+        now = datetime.now().isoformat()
+        entry = self.entries.get(fingerprint)
+        if entry is None:
+            entry = {"fingerprint": fingerprint, **fields, "count": 0, "first_seen": now,
+                     "last_seen": now, "unlogged": 0, "_last_logged": None}
+            self.entries[fingerprint] = entry
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.totals["evicted"] += 1
+        else:
+            self.entries.move_to_end(fingerprint)
+        entry["count"] += 1
+        entry["last_seen"] = now
+        return entry
+
+    def _should_log(self, entry: dict) -> str:
+        """Return 'full', 'summary' or '' for this occurrence; caller holds the lock"""
+        now = time.monotonic()
+        if now - self._window_started >= self.summary_interval:
+            self._window_started = now
+            self._window_full_logs = 0
+
+        if entry["_last_logged"] is None:
+            if self._window_full_logs < self.max_full_logs_per_interval:
+                self._window_full_logs += 1
+                entry["_last_logged"] = now
+                return "full"
+        elif now - entry["_last_logged"] >= self.summary_interval:
+            entry["_last_logged"] = now
+            return "summary"
+
+        entry["unlogged"] += 1
+        self.totals["suppressed"] += 1
+        return ""
+
+    def _summary(self, entry: dict, current: bool = True) -> str:
+        repeats = entry["unlogged"] + (1 if current else 0)
+        entry["unlogged"] = 0
+        return (f"Repeated error [{entry['fingerprint']}] x{repeats} since last log "
+                f"({entry['count']} total): {entry['summary']}")
+
+    def exception(self, request: Request, exc: BaseException) -> str:
+        """Record an unhandled exception and return its fingerprint"""
+        route = route_path(request)
+        fingerprint = self.exception_fingerprint(exc, route)
+        with self._lock:
+            self.totals["exceptions"] += 1
+            entry = self._entry(
+                fingerprint,
+                kind="exception",
+                summary=f"{type(exc).__name__} on {request.method} {route}: {str(exc)[:200]}",
+            )
+            decision = self._should_log(entry)
+            summary = self._summary(entry) if decision == "summary" else None
+
+        if decision == "full":
+            details = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+            self.logger.error(
+                f"Unhandled Exception [{fingerprint}] {request.method} {request.url} - "
+                f"{type(exc).__name__}: {exc}\n{details}"
+            )
+        elif summary:
+            self.logger.error(summary)
+        return fingerprint
+
+    def handled(self, where: str, exc: BaseException, message: str) -> str:
+        """Record an exception an endpoint caught itself and return its fingerprint.
+
+        ``where`` (the endpoint function) is part of the fingerprint;
+        ``message`` is only logged, so it may carry ids.
+        """
+        fingerprint = self.exception_fingerprint(exc, where)
+        with self._lock:
+            self.totals["exceptions"] += 1
+            entry = self._entry(
+                fingerprint,
+                kind="exception",
+                summary=f"{type(exc).__name__} in {where}: {str(exc)[:200]}",
+            )
+            decision = self._should_log(entry)
+            summary = self._summary(entry) if decision == "summary" else None
+
+        if decision == "full":
+            details = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+            self.logger.error(f"{message} [{fingerprint}] - {type(exc).__name__}: {exc}\n{details}")
+        elif summary:
+            self.logger.error(summary)
+        return fingerprint
+
+    def http_error(self, request: Request, status_code: int, detail) -> str:
+        """Record an HTTPException response and return its fingerprint"""
+        route = route_path(request)
+        detail = str(detail)[:200]
+        fingerprint = self._digest(status_code, request.method, route, detail)
+        with self._lock:
+            self.totals["http_errors"] += 1
+            entry = self._entry(
+                fingerprint,
+                kind="http",
+                status_code=status_code,
+                summary=f"{status_code} on {request.method} {route}: {detail}",
+            )
+            decision = self._should_log(entry)
+            summary = self._summary(entry) if decision == "summary" else None
+
+        if decision == "full":
+            self.logger.warning(f"HTTP Exception [{fingerprint}] {status_code} - {detail} - {request.method} {request.url}")
+        elif summary:
+            self.logger.warning(summary)
+        return fingerprint
+
+    def flush(self):
+        """Log a final summary for every entry with unlogged repeats"""
+        with self._lock:
+            pending = [self._summary(entry, current=False) for entry in self.entries.values() if entry["unlogged"]]
+        for line in pending:
+            self.logger.warning(line)
+
+    def snapshot(self, limit: int = 100) -> dict:
+        """Most recently seen entries first, for the admin endpoint"""
+        with self._lock:
+            entries = [
+                {key: value for key, value in entry.items() if not key.startswith("_")}
+                for entry in reversed(self.entries.values())
+            ][:limit]
+            return {"tracked": len(self.entries), "totals": dict(self.totals), "errors": entries}
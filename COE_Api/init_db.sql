@@ -41,6 +41,138 @@ CREATE TABLE IF NOT EXISTS event_registrations (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Event calendar lookups: date ranges overall and within a domain
+CREATE INDEX IF NOT EXISTS idx_events_event_date ON events (event_date);
+CREATE INDEX IF NOT EXISTS idx_events_domain_date ON events (domain_id, event_date);
+
+-- Registrations per event, maintained by the registration statement itself;
+-- capacity NULL means unlimited
+ALTER TABLE events ADD COLUMN IF NOT EXISTS capacity INTEGER CHECK (capacity > 0);
+ALTER TABLE events ADD COLUMN IF NOT EXISTS registration_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE events e SET registration_count = r.count
+FROM (SELECT event_id, COUNT(*) AS count FROM event_registrations GROUP BY event_id) r
+WHERE e.id = r.event_id AND e.registration_count <> r.count;
+
+-- Moderation queue: moderators claim pending blogs with FOR UPDATE SKIP LOCKED.
+-- A claim is a lease; claims older than BLOG_CLAIM_TTL_SECONDS can be taken over.
+ALTER TABLE blogs ADD COLUMN IF NOT EXISTS claimed_by VARCHAR(100);
+ALTER TABLE blogs ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP;
+ALTER TABLE blogs ADD COLUMN IF NOT EXISTS reviewed_by VARCHAR(100);
+ALTER TABLE blogs ADD COLUMN IF NOT EXISTS reviewed_at TIMESTAMP;
+
+-- Only pending rows are indexed, in queue order, so the queue stays small
+-- however many blogs have been reviewed
+CREATE INDEX IF NOT EXISTS idx_blogs_pending_queue
+    ON blogs (created_at, id) WHERE status = 'pending';
+
+-- Listing columns derived from content, so list queries never read the body.
+-- Large bodies are already TOASTed out of line; they are only fetched when
+-- content itself is selected (GET /blogs/{blog_id}).
+ALTER TABLE blogs ADD COLUMN IF NOT EXISTS excerpt TEXT;
+ALTER TABLE blogs ADD COLUMN IF NOT EXISTS word_count INTEGER;
+ALTER TABLE blogs ADD COLUMN IF NOT EXISTS reading_time_minutes INTEGER;
+
+CREATE OR REPLACE FUNCTION blogs_fill_summary() RETURNS trigger AS $$
+DECLARE
+    flat TEXT := btrim(regexp_replace(NEW.content, '\s+', ' ', 'g'));
+BEGIN
+    NEW.word_count := COALESCE(array_length(string_to_array(NULLIF(flat, ''), ' '), 1), 0);
+    -- Roughly 200 words per minute
+    NEW.reading_time_minutes := GREATEST(1, CEIL(NEW.word_count / 200.0));
+    -- First 280 characters, cut back to a word boundary
+    NEW.excerpt := CASE
+        WHEN length(flat) <= 280 THEN flat
+        ELSE COALESCE(NULLIF(regexp_replace(left(flat, 281), '\s*\S*$', ''), ''), left(flat, 280)) || '…'
+    END;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER blogs_fill_summary
+    BEFORE INSERT OR UPDATE OF content ON blogs
+    FOR EACH ROW EXECUTE FUNCTION blogs_fill_summary();
+
+-- Backfill rows written before the trigger existed
+UPDATE blogs SET content = content WHERE excerpt IS NULL;
+
+-- Trigram indexes for ?search= (substring ILIKE on title and content): only
+-- the blogs whose trigrams match are fetched and their bodies rechecked,
+-- instead of every body being detoasted on every search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_blogs_title_trgm ON blogs USING gin (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_blogs_content_trgm ON blogs USING gin (content gin_trgm_ops);
+
+-- Blog view/read counts, written in batches by the in-process counter buffer.
+-- trending_score is decayed to score_updated_at; readers decay it to now.
+CREATE TABLE IF NOT EXISTS blog_view_counts (
+    blog_id INTEGER PRIMARY KEY REFERENCES blogs(id) ON DELETE CASCADE,
+    views BIGINT NOT NULL DEFAULT 0,
+    reads BIGINT NOT NULL DEFAULT 0,
+    trending_score DOUBLE PRECISION NOT NULL DEFAULT 0,
+    score_updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_blog_view_counts_updated
+    ON blog_view_counts (score_updated_at);
+
+-- Per-table change counters, bumped by every statement that writes the table.
+-- Each table's counter is split over 16 shard rows and a statement bumps the
+-- shard of its backend (pg_backend_pid() % 16), so concurrent writers mostly
+-- lock different rows instead of queueing on one; readers sum the shards.
+-- A transaction runs on one backend, so it holds at most one shard per table.
+-- Versions only ever increase; they do not step by exactly one per statement
+-- (an INSERT ... ON CONFLICT DO UPDATE fires both the INSERT and UPDATE
+-- triggers). List endpoints hash them into ETags for conditional GETs.
+CREATE TABLE IF NOT EXISTS change_counters (
+    table_name TEXT NOT NULL,
+    shard SMALLINT NOT NULL DEFAULT 0,
+    version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (table_name, shard)
+);
+
+-- Counters created before sharding were keyed on table_name alone; their
+-- version carries over as shard 0
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_attribute
+                   WHERE attrelid = 'change_counters'::regclass AND attname = 'shard') THEN
+        ALTER TABLE change_counters ADD COLUMN shard SMALLINT NOT NULL DEFAULT 0;
+        ALTER TABLE change_counters DROP CONSTRAINT change_counters_pkey;
+        ALTER TABLE change_counters ADD PRIMARY KEY (table_name, shard);
+    END IF;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION change_counter_shard() RETURNS SMALLINT AS $$
+    SELECT (pg_backend_pid() % 16)::SMALLINT;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION bump_change_counter() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO change_counters (table_name, shard, version)
+    VALUES (TG_TABLE_NAME, change_counter_shard(), 1)
+    ON CONFLICT (table_name, shard) DO UPDATE SET version = change_counters.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER domains_change_counter
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON domains
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_change_counter();
+
+CREATE OR REPLACE TRIGGER blogs_change_counter
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON blogs
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_change_counter();
+
+CREATE OR REPLACE TRIGGER events_change_counter
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON events
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_change_counter();
+
+CREATE OR REPLACE TRIGGER event_registrations_change_counter
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON event_registrations
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_change_counter();
+
 -- Insert some sample domains
 INSERT INTO domains (name, description) VALUES 
 ('AI', 'Artificial Intelligence'),
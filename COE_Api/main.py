@@ -1,15 +1,29 @@
 # main.py
+import time
+
+# Startup profile, exposed at /admin/startup
+_process_started = time.perf_counter()
+STARTUP_TIMINGS = {}
+
+import asyncio
 import logging
 import os
 import sys
 import traceback
 from datetime import datetime
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Path, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import date
-from database import BlogsDB, DomainsDB, EventsDB, EventRegistrationsDB, AdminDB
+from database import BlogsDB, BlogViewsDB, ModerationDB, DomainsDB, EventsDB, EventRegistrationsDB, AdminDB, ChangeCountersDB, db_manager
+from error_log import ErrorLog
+from health import ConnectionProbe, HealthMonitor
+from view_counters import ViewCounterBuffer
+from responses import FastJSONResponse, make_etag, not_modified, with_etag
+
+STARTUP_TIMINGS["imports_ms"] = round((time.perf_counter() - _process_started) * 1000, 2)
 
 # Configure logging
 def setup_logging():
@@ -54,8 +68,21 @@ def setup_logging():
 # Initialize logging
 logger = setup_logging()
 
+# Exception handlers log each distinct error once, then periodic repeat counts
+error_log = ErrorLog(logger, summary_interval=float(os.getenv("ERROR_LOG_SUMMARY_INTERVAL", 60)))
+
+def record_timing(name: str, func, *args):
+    """Run ``func`` and record its duration in STARTUP_TIMINGS; failures are logged, not raised"""
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    except Exception as e:
+        logger.warning(f"⚠️ Startup task {name} failed: {str(e)}")
+    finally:
+        STARTUP_TIMINGS[f"{name}_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
 def log_system_info():
-    """Log system information at startup"""
+    """Log system information (run in the background after startup)"""
     import platform
     import psutil
     
@@ -94,6 +121,19 @@ class BlogUpdate(BaseModel):
     author_name: Optional[str] = None
     domain_name: Optional[str] = None
 
+class ModerationClaim(BaseModel):
+    moderator: str
+    limit: int = 10
+
+class ModerationDecision(BaseModel):
+    moderator: str
+    blog_ids: List[int]
+    status: str
+
+class ModerationRelease(BaseModel):
+    moderator: str
+    blog_ids: List[int]
+
 class DomainCreate(BaseModel):
     name: str
     description: Optional[str] = None
@@ -104,6 +144,7 @@ class EventCreate(BaseModel):
     event_date: date
     event_type: str
     domain_id: int
+    capacity: Optional[int] = None
 
 class EventRegistrationCreate(BaseModel):
     event_id: int
@@ -116,18 +157,53 @@ app = FastAPI(
     description="API for managing blogs, events, domains and registrations",
     version="1.0.0"
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Blog moderation: statuses a moderator may set, batch cap and claim lease length
+BLOG_STATUSES = ("pending", "approved", "rejected")
+MODERATION_DECISIONS = ("approved", "rejected")
+MAX_MODERATION_BATCH = 100
+BLOG_CLAIM_TTL_SECONDS = int(os.getenv("BLOG_CLAIM_TTL_SECONDS", 900))
+
+# Non-pending moderation counts are planner estimates, re-read at most this often
+BLOG_COUNTS_ESTIMATE_TTL_SECONDS = float(os.getenv("BLOG_COUNTS_ESTIMATE_TTL_SECONDS", 60))
+
+# Blog views and reads are buffered in memory and flushed in batches;
+# a read (client-reported) weighs more than a view in the trending score
+TRENDING_HALF_LIFE_SECONDS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", 24)) * 3600
+TRENDING_READ_WEIGHT = float(os.getenv("TRENDING_READ_WEIGHT", 3))
+view_counters = ViewCounterBuffer(
+    lambda counts: BlogViewsDB.add_counts(counts, TRENDING_READ_WEIGHT, TRENDING_HALF_LIFE_SECONDS),
+    interval=float(os.getenv("VIEW_FLUSH_INTERVAL", 10)),
+    threshold=int(os.getenv("VIEW_FLUSH_THRESHOLD", 1000)),
+    max_blogs=int(os.getenv("VIEW_BUFFER_MAX_BLOGS", 10000))
+)
+
+# Largest page the event list endpoints return
+MAX_EVENTS_PAGE = 500
+
+# Probes read this instead of querying the database themselves. The check
+# runs on a dedicated connection so pool saturation is reported, not failed.
+health_probe = ConnectionProbe(db_manager.connect)
+health_monitor = HealthMonitor(
+    health_probe,
+    db_manager.pool_state,
+    interval=float(os.getenv("HEALTH_CHECK_INTERVAL", 10))
+)
+
+def list_etag(request: Request, *tables: str, with_date: bool = False) -> Optional[str]:
+    """ETag for a list endpoint from the change counters of the tables it reads"""
+    versions = ChangeCountersDB.get_versions(list(tables), with_date=with_date)
+    if versions is None:
+        return None
+    return make_etag(request.url.path, request.url.query, *versions)
 
 # Global exception handler for unhandled errors
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle all unhandled exceptions"""
-    error_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    logger.error(f"Unhandled Exception [ID: {error_id}]")
-    logger.error(f"Request: {request.method} {request.url}")
-    logger.error(f"Exception Type: {type(exc).__name__}")
-    logger.error(f"Exception Message: {str(exc)}")
-    logger.error(f"Traceback: {traceback.format_exc()}")
+    fingerprint = error_log.exception(request, exc)
+    error_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}-{fingerprint[:8]}"
     
     return JSONResponse(
         status_code=500,
@@ -143,8 +219,7 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle HTTP exceptions with logging"""
-    logger.warning(f"HTTP Exception: {exc.status_code} - {exc.detail}")
-    logger.warning(f"Request: {request.method} {request.url}")
+    error_log.http_error(request, exc.status_code, exc.detail)
     
     return JSONResponse(
         status_code=exc.status_code,
@@ -159,8 +234,21 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 # Startup event
 @app.on_event("startup")
 async def startup_event():
-    """Log startup information"""
-    log_system_info()
+    """Start background work and log startup information.
+
+    Nothing here waits on the database or on system diagnostics: the
+    system info dump and the optional pool prewarm (DB_POOL_PREWARM=<count>)
+    run in the default executor while requests are already being served.
+    """
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    loop.run_in_executor(None, record_timing, "system_info", log_system_info)
+    if db_manager.prewarm_count:
+        loop.run_in_executor(None, record_timing, "pool_prewarm", db_manager.prewarm)
+    health_monitor.start()
+    view_counters.start()
+    STARTUP_TIMINGS["startup_event_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    STARTUP_TIMINGS["ready_after_ms"] = round((time.perf_counter() - _process_started) * 1000, 2)
     logger.info("🚀 COE API application started successfully")
     logger.info("📊 API Documentation available at: /docs")
     logger.info("📋 ReDoc Documentation available at: /redoc")
@@ -170,6 +258,10 @@ async def startup_event():
 async def shutdown_event():
     """Log shutdown information"""
     logger.info("🛑 COE API application shutting down")
+    health_monitor.stop()
+    health_probe.close()
+    await asyncio.get_running_loop().run_in_executor(None, view_counters.stop)
+    error_log.flush()
     logger.info(f"📅 Shutdown Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 # Request logging middleware
@@ -192,9 +284,10 @@ async def log_requests(request: Request, call_next):
         logger.info(f"📤 Response: {response.status_code} - {process_time:.3f}s")
         
         return response
-    except Exception as e:
+    except Exception:
+        # The global exception handler logs the error itself (deduplicated)
         process_time = (datetime.now() - start_time).total_seconds()
-        logger.error(f"❌ Request failed: {str(e)} - {process_time:.3f}s")
+        logger.info(f"📤 Response: failed - {process_time:.3f}s")
         raise
 
 # Root endpoint
@@ -235,26 +328,147 @@ def create_blog(blog: BlogCreate):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Unexpected error creating blog: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("create_blog", e, "❌ Unexpected error creating blog")
         raise HTTPException(status_code=500, detail="Internal server error while creating blog")
 
 @app.get("/blogs/", tags=["Blogs"])
-def get_blogs(domain_name: Optional[str] = None, search: Optional[str] = None):
-    """Get all blogs with optional filtering"""
+def get_blogs(request: Request, domain_name: Optional[str] = None, search: Optional[str] = None,
+              status: Optional[str] = None):
+    """List blogs with excerpts (full content via /blogs/{blog_id}); search matches title and content"""
     try:
-        logger.info(f"📚 Fetching blogs - Domain: {domain_name or 'All'}, Search: {search or 'None'}")
+        logger.info(f"📚 Fetching blogs - Domain: {domain_name or 'All'}, Search: {search or 'None'}, Status: {status or 'All'}")
+        
+        if status is not None and status not in BLOG_STATUSES:
+            raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(BLOG_STATUSES)}")
         
-        blogs = BlogsDB.get_blogs(domain_name=domain_name, search=search)
+        etag = list_etag(request, "blogs", "domains")
+        cached = etag and not_modified(request, etag)
+        if cached:
+            logger.info("✅ Blogs not modified")
+            return cached
+        
+        blogs = BlogsDB.get_blogs(domain_name=domain_name, search=search, status=status)
         
         logger.info(f"✅ Retrieved {len(blogs)} blogs")
-        return blogs
+        return with_etag(FastJSONResponse(blogs), etag)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"❌ Error fetching blogs: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("get_blogs", e, "❌ Error fetching blogs")
         raise HTTPException(status_code=500, detail="Internal server error while fetching blogs")
 
+@app.get("/blogs/trending", tags=["Blogs"])
+def get_trending_blogs(limit: int = 10, domain_name: Optional[str] = None, status: Optional[str] = None):
+    """Blogs ranked by recent views and reads, decayed with TRENDING_HALF_LIFE_HOURS"""
+    try:
+        logger.info(f"🔥 Fetching trending blogs - Domain: {domain_name or 'All'}, Status: {status or 'All'}")
+        
+        if status is not None and status not in BLOG_STATUSES:
+            raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(BLOG_STATUSES)}")
+        
+        blogs = BlogViewsDB.get_trending(
+            limit=max(1, min(limit, 100)),
+            half_life_seconds=TRENDING_HALF_LIFE_SECONDS,
+            domain_name=domain_name,
+            status=status
+        )
+        
+        logger.info(f"✅ Retrieved {len(blogs)} trending blogs")
+        return FastJSONResponse(blogs)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_log.handled("get_trending_blogs", e, "❌ Error fetching trending blogs")
+        raise HTTPException(status_code=500, detail="Internal server error while fetching trending blogs")
+
+# Moderation queue endpoints (declared before /blogs/{blog_id})
+@app.post("/blogs/moderation/claim", tags=["Moderation"])
+def claim_blogs(claim: ModerationClaim):
+    """Claim the oldest pending blogs for review; concurrent moderators get disjoint batches"""
+    try:
+        limit = max(1, min(claim.limit, MAX_MODERATION_BATCH))
+        logger.info(f"🛡️ Moderator {claim.moderator} claiming up to {limit} blogs")
+        
+        blogs = ModerationDB.claim_blogs(claim.moderator, limit, BLOG_CLAIM_TTL_SECONDS)
+        
+        logger.info(f"✅ Moderator {claim.moderator} claimed {len(blogs)} blogs")
+        return {"moderator": claim.moderator, "claim_ttl_seconds": BLOG_CLAIM_TTL_SECONDS, "blogs": blogs}
+        
+    except Exception as e:
+        error_log.handled("claim_blogs", e, "❌ Error claiming blogs")
+        raise HTTPException(status_code=500, detail="Internal server error while claiming blogs")
+
+@app.post("/blogs/moderation/decisions", tags=["Moderation"])
+def decide_blogs(decision: ModerationDecision):
+    """Approve or reject a batch of pending blogs in one statement"""
+    try:
+        if decision.status not in MODERATION_DECISIONS:
+            raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(MODERATION_DECISIONS)}")
+        if not decision.blog_ids:
+            raise HTTPException(status_code=400, detail="No blog ids provided")
+        if len(decision.blog_ids) > MAX_MODERATION_BATCH:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_MODERATION_BATCH} blogs per decision")
+        
+        logger.info(f"🛡️ Moderator {decision.moderator} marking {len(decision.blog_ids)} blogs as {decision.status}")
+        
+        updated = ModerationDB.decide_blogs(
+            decision.blog_ids, decision.status, decision.moderator, BLOG_CLAIM_TTL_SECONDS
+        )
+        if updated is None:
+            raise HTTPException(status_code=500, detail="Internal server error while moderating blogs")
+        
+        skipped = sorted(set(decision.blog_ids) - set(updated))
+        if skipped:
+            logger.warning(f"⚠️ Skipped blogs {skipped} - not pending or claimed by another moderator")
+        logger.info(f"✅ {len(updated)} blogs marked as {decision.status}")
+        return {"status": decision.status, "updated": sorted(updated), "skipped": skipped}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_log.handled("decide_blogs", e, "❌ Error moderating blogs")
+        raise HTTPException(status_code=500, detail="Internal server error while moderating blogs")
+
+@app.post("/blogs/moderation/release", tags=["Moderation"])
+def release_blogs(release: ModerationRelease):
+    """Return claimed blogs to the queue without a decision"""
+    try:
+        logger.info(f"🛡️ Moderator {release.moderator} releasing {len(release.blog_ids)} blogs")
+        
+        released = ModerationDB.release_blogs(release.blog_ids, release.moderator)
+        
+        logger.info(f"✅ Released {len(released)} blogs")
+        return {"released": sorted(released)}
+        
+    except Exception as e:
+        error_log.handled("release_blogs", e, "❌ Error releasing blogs")
+        raise HTTPException(status_code=500, detail="Internal server error while releasing blogs")
+
+@app.get("/blogs/moderation/counts", tags=["Moderation"])
+def get_moderation_counts():
+    """Number of blogs in each status and how many pending blogs are claimed.
+    
+    Pending and claimed counts are exact; statuses listed in "estimated" come
+    from planner statistics and may lag by up to an autovacuum cycle.
+    """
+    try:
+        logger.info("📊 Fetching blog status counts")
+        
+        counts = ModerationDB.get_status_counts(BLOG_CLAIM_TTL_SECONDS, BLOG_COUNTS_ESTIMATE_TTL_SECONDS)
+        if counts is None:
+            raise HTTPException(status_code=500, detail="Internal server error while fetching blog counts")
+        
+        logger.info(f"✅ Blog status counts: {counts['counts']}")
+        return counts
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_log.handled("get_moderation_counts", e, "❌ Error fetching blog status counts")
+        raise HTTPException(status_code=500, detail="Internal server error while fetching blog counts")
+
 @app.get("/blogs/{blog_id}", tags=["Blogs"])
 def get_blog(blog_id: int):
     """Get a specific blog by ID"""
@@ -267,56 +481,71 @@ def get_blog(blog_id: int):
             logger.warning(f"⚠️ Blog not found with ID: {blog_id}")
             raise HTTPException(status_code=404, detail="Blog not found")
         
+        view_counters.view(blog_id)
         logger.info(f"✅ Blog retrieved: '{blog.get('title', 'Unknown')}'")
         return blog
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Error fetching blog {blog_id}: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("get_blog", e, f"❌ Error fetching blog {blog_id}")
         raise HTTPException(status_code=500, detail="Internal server error while fetching blog")
 
+@app.post("/blogs/{blog_id}/read", status_code=202, tags=["Blogs"])
+def record_blog_read(blog_id: int = Path(..., ge=1, le=2147483647)):
+    """Record that a reader finished a blog; buffered and counted towards trending.
+    
+    The id is not looked up (unknown ids are dropped when the buffer is
+    flushed); when the buffer already holds its maximum number of blogs the
+    read is ignored and reported as "dropped".
+    """
+    if not view_counters.read(blog_id):
+        return {"blog_id": blog_id, "status": "dropped"}
+    return {"blog_id": blog_id, "status": "recorded"}
+
+def apply_blog_update(blog_id: int, blog: BlogUpdate):
+    """Update only the supplied fields of a pending blog in a single round trip"""
+    fields = {
+        name: getattr(blog, name)
+        for name in ("title", "content", "author_name", "domain_name")
+        if getattr(blog, name) is not None
+    }
+    if not fields:
+        raise HTTPException(status_code=400, detail="No fields provided for update")
+
+    logger.info(f"✏️ Updating blog {blog_id}: {', '.join(fields)}")
+    outcome, updated_blog = BlogsDB.update_blog(blog_id, fields)
+
+    if outcome == "not_found":
+        logger.warning(f"⚠️ Blog not found for update with ID: {blog_id}")
+        raise HTTPException(status_code=404, detail="Blog not found")
+    if outcome == "not_pending":
+        logger.warning(f"⚠️ Cannot update blog {blog_id} - not in pending status")
+        raise HTTPException(status_code=400, detail="Cannot update blog (only pending blogs can be updated)")
+
+    logger.info(f"✅ Blog {blog_id} updated successfully")
+    return updated_blog
+
 @app.put("/blogs/{blog_id}", tags=["Blogs"])
 def update_blog(blog_id: int, blog: BlogUpdate):
     """Update a blog (only pending blogs can be updated)"""
     try:
-        logger.info(f"✏️ Updating blog with ID: {blog_id}")
-        
-        # Get current blog to merge with updates
-        current_blog = BlogsDB.get_blog_by_id(blog_id)
-        if not current_blog:
-            logger.warning(f"⚠️ Blog not found for update with ID: {blog_id}")
-            raise HTTPException(status_code=404, detail="Blog not found")
-        
-        # Use existing values if not provided in update
-        title = blog.title if blog.title is not None else current_blog["title"]
-        content = blog.content if blog.content is not None else current_blog["content"]
-        author_name = blog.author_name if blog.author_name is not None else current_blog["author_name"]
-        domain_name = blog.domain_name if blog.domain_name is not None else current_blog["domain_name"]
-        
-        logger.info(f"✏️ Updating blog: '{title}' by {author_name}")
-        
-        updated_blog = BlogsDB.update_blog(
-            blog_id=blog_id,
-            title=title,
-            content=content,
-            author_name=author_name,
-            domain_name=domain_name
-        )
-        
-        if not updated_blog:
-            logger.warning(f"⚠️ Cannot update blog {blog_id} - may not be in pending status")
-            raise HTTPException(status_code=400, detail="Cannot update blog (only pending blogs can be updated)")
-        
-        logger.info(f"✅ Blog {blog_id} updated successfully")
-        return updated_blog
-        
+        return apply_blog_update(blog_id, blog)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Error updating blog {blog_id}: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("update_blog", e, f"❌ Error updating blog {blog_id}")
+        raise HTTPException(status_code=500, detail="Internal server error while updating blog")
+
+@app.patch("/blogs/{blog_id}", tags=["Blogs"])
+def patch_blog(blog_id: int, blog: BlogUpdate):
+    """Partially update a pending blog; omitted fields are left unchanged"""
+    try:
+        return apply_blog_update(blog_id, blog)
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_log.handled("patch_blog", e, f"❌ Error patching blog {blog_id}")
         raise HTTPException(status_code=500, detail="Internal server error while updating blog")
 
 @app.delete("/blogs/{blog_id}", tags=["Blogs"])
@@ -337,8 +566,7 @@ def delete_blog(blog_id: int):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Error deleting blog {blog_id}: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("delete_blog", e, f"❌ Error deleting blog {blog_id}")
         raise HTTPException(status_code=500, detail="Internal server error while deleting blog")
 
 # Domain endpoints
@@ -351,11 +579,10 @@ def get_domains():
         domains = DomainsDB.get_all_domains()
         
         logger.info(f"✅ Retrieved {len(domains)} domains")
-        return domains
+        return FastJSONResponse(domains)
         
     except Exception as e:
-        logger.error(f"❌ Error fetching domains: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("get_domains", e, "❌ Error fetching domains")
         raise HTTPException(status_code=500, detail="Internal server error while fetching domains")
 
 @app.post("/domains/", tags=["Domains"])
@@ -377,8 +604,7 @@ def create_domain(domain: DomainCreate):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Unexpected error creating domain: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("create_domain", e, "❌ Unexpected error creating domain")
         raise HTTPException(status_code=500, detail="Internal server error while creating domain")
 
 @app.get("/domains/{domain_id}", tags=["Domains"])
@@ -399,8 +625,7 @@ def get_domain(domain_id: int):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Error fetching domain {domain_id}: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("get_domain", e, f"❌ Error fetching domain {domain_id}")
         raise HTTPException(status_code=500, detail="Internal server error while fetching domain")
 
 # Event endpoints
@@ -410,14 +635,18 @@ def create_event(event: EventCreate):
     try:
         logger.info(f"📅 Creating event: '{event.title}'")
         logger.info(f"📅 Event date: {event.event_date}, Type: {event.event_type}")
-        logger.info(f"📅 Domain ID: {event.domain_id}")
+        logger.info(f"📅 Domain ID: {event.domain_id}, Capacity: {event.capacity or 'Unlimited'}")
+        
+        if event.capacity is not None and event.capacity < 1:
+            raise HTTPException(status_code=400, detail="capacity must be at least 1")
         
         result = EventsDB.create_event(
             title=event.title,
             description=event.description,
             event_date=str(event.event_date),
             event_type=event.event_type,
-            domain_id=event.domain_id
+            domain_id=event.domain_id,
+            capacity=event.capacity
         )
         
         if not result:
@@ -430,24 +659,86 @@ def create_event(event: EventCreate):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Unexpected error creating event: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("create_event", e, "❌ Unexpected error creating event")
         raise HTTPException(status_code=500, detail="Internal server error while creating event")
 
+def fetch_events(request: Request, upcoming: bool, **filters):
+    """Shared body of the event list endpoints: validate paging, ETag, query"""
+    limit, offset = filters.get("limit"), filters.get("offset", 0)
+    if limit is not None and not 1 <= limit <= MAX_EVENTS_PAGE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_EVENTS_PAGE}")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset must not be negative")
+    if filters.get("date_from") and filters.get("date_to") and filters["date_from"] > filters["date_to"]:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    
+    # "Upcoming" moves with the calendar even when no event changes; the date
+    # comes from the database, the same clock the query's CURRENT_DATE uses
+    etag = list_etag(request, "events", "domains", with_date=upcoming)
+    cached = etag and not_modified(request, etag)
+    if cached:
+        logger.info("✅ Events not modified")
+        return cached
+    
+    for key in ("date_from", "date_to"):
+        if filters.get(key) is not None:
+            filters[key] = str(filters[key])
+    events = EventsDB.get_events(upcoming=upcoming, **filters)
+    
+    logger.info(f"✅ Retrieved {len(events)} events")
+    return with_etag(FastJSONResponse(events), etag)
+
 @app.get("/events/", tags=["Events"])
-def get_events(domain_name: Optional[str] = None):
-    """Get all events with optional domain filtering"""
+def get_events(
+    request: Request,
+    domain_name: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    event_type: Optional[str] = None,
+    upcoming: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0
+):
+    """Get events filtered by domain, date range (from/to) and type; upcoming=true lists today on, soonest first"""
     try:
-        logger.info(f"📅 Fetching events - Domain: {domain_name or 'All'}")
+        logger.info(f"📅 Fetching events - Domain: {domain_name or 'All'}, From: {date_from or '-'}, "
+                    f"To: {date_to or '-'}, Type: {event_type or 'All'}, Upcoming: {upcoming}")
         
-        events = EventsDB.get_events(domain_name=domain_name)
+        return fetch_events(
+            request, upcoming,
+            domain_name=domain_name, date_from=date_from, date_to=date_to,
+            event_type=event_type, limit=limit, offset=offset
+        )
         
-        logger.info(f"✅ Retrieved {len(events)} events")
-        return events
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_log.handled("get_events", e, "❌ Error fetching events")
+        raise HTTPException(status_code=500, detail="Internal server error while fetching events")
+
+@app.get("/events/upcoming", tags=["Events"])
+def get_upcoming_events(
+    request: Request,
+    domain_name: Optional[str] = None,
+    event_type: Optional[str] = None,
+    date_to: Optional[date] = Query(None, alias="to"),
+    limit: int = 50,
+    offset: int = 0
+):
+    """Events from today on, soonest first"""
+    try:
+        logger.info(f"📅 Fetching upcoming events - Domain: {domain_name or 'All'}, Type: {event_type or 'All'}")
         
+        return fetch_events(
+            request, True,
+            domain_name=domain_name, date_to=date_to,
+            event_type=event_type, limit=limit, offset=offset
+        )
+        
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"❌ Error fetching events: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("get_upcoming_events", e, "❌ Error fetching upcoming events")
         raise HTTPException(status_code=500, detail="Internal server error while fetching events")
 
 @app.get("/events/{event_id}", tags=["Events"])
@@ -468,8 +759,7 @@ def get_event(event_id: int):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Error fetching event {event_id}: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("get_event", e, f"❌ Error fetching event {event_id}")
         raise HTTPException(status_code=500, detail="Internal server error while fetching event")
 
 # Event Registration endpoints
@@ -480,24 +770,30 @@ def create_registration(registration: EventRegistrationCreate):
         logger.info(f"📝 Creating registration for event {registration.event_id}")
         logger.info(f"📝 User: {registration.user_name} ({registration.email})")
         
-        result = EventRegistrationsDB.create_registration(
+        outcome, result = EventRegistrationsDB.create_registration(
             event_id=registration.event_id,
             user_name=registration.user_name,
             email=registration.email
         )
         
-        if not result:
-            logger.error(f"❌ Failed to create registration for event {registration.event_id}")
-            raise HTTPException(status_code=400, detail="Failed to create registration")
-        
-        logger.info(f"✅ Registration created successfully with ID: {result.get('id', 'Unknown')}")
+        if outcome == "not_found":
+            logger.warning(f"⚠️ Event not found for registration with ID: {registration.event_id}")
+            raise HTTPException(status_code=404, detail="Event not found")
+        if outcome == "full":
+            logger.warning(f"⚠️ Event {registration.event_id} is full")
+            raise HTTPException(status_code=409, detail="Event is full")
+        if outcome == "invalid":
+            logger.warning(f"⚠️ Registration rejected for event {registration.event_id}: {result}")
+            raise HTTPException(status_code=400, detail=f"Failed to create registration: {result}")
+        
+        logger.info(f"✅ Registration created successfully with ID: {result['id']} "
+                    f"({result['registration_count']}/{result['capacity'] or 'unlimited'})")
         return result
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Unexpected error creating registration: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("create_registration", e, "❌ Unexpected error creating registration")
         raise HTTPException(status_code=500, detail="Internal server error while creating registration")
 
 @app.get("/event-registrations/event/{event_id}", tags=["Event Registrations"])
@@ -509,11 +805,10 @@ def get_event_registrations(event_id: int):
         registrations = EventRegistrationsDB.get_registrations_by_event(event_id)
         
         logger.info(f"✅ Retrieved {len(registrations)} registrations for event {event_id}")
-        return registrations
+        return FastJSONResponse(registrations)
         
     except Exception as e:
-        logger.error(f"❌ Error fetching registrations for event {event_id}: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("get_event_registrations", e, f"❌ Error fetching registrations for event {event_id}")
         raise HTTPException(status_code=500, detail="Internal server error while fetching registrations")
 
 # Admin endpoints
@@ -530,48 +825,49 @@ def get_dashboard_stats():
         return stats
         
     except Exception as e:
-        logger.error(f"❌ Error fetching dashboard stats: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        error_log.handled("get_dashboard_stats", e, "❌ Error fetching dashboard stats")
         raise HTTPException(status_code=500, detail="Internal server error while fetching dashboard stats")
 
+@app.get("/admin/startup", tags=["Admin"])
+def get_startup_timings():
+    """Import and startup timing breakdown in milliseconds (background tasks appear when done)"""
+    return STARTUP_TIMINGS
+
+@app.get("/admin/view-counters", tags=["Admin"])
+def get_view_counter_stats():
+    """Buffered view/read increments and flush totals for this worker"""
+    return view_counters.snapshot()
+
+@app.get("/admin/errors", tags=["Admin"])
+def get_error_summary(limit: int = 100):
+    """Deduplicated errors seen since startup, most recent first"""
+    return error_log.snapshot(limit=max(1, min(limit, 500)))
+
+@app.get("/health/live", tags=["Admin"])
+def liveness_probe():
+    """Liveness probe: the process is up and serving requests"""
+    return health_monitor.liveness()
+
+@app.get("/health/ready", tags=["Admin"])
+def readiness_probe():
+    """Readiness probe from the cached database check and pool state (no queries)"""
+    ready, details = health_monitor.readiness()
+    return JSONResponse(status_code=200 if ready else 503, content=details)
+
 @app.get("/admin/health", tags=["Admin"])
 def health_check():
-    """Health check endpoint"""
-    try:
-        logger.info("🏥 Health check requested")
-        
-        # Check database connectivity
-        try:
-            AdminDB.get_dashboard_stats()
-            db_status = "healthy"
-        except Exception as e:
-            logger.error(f"❌ Database health check failed: {str(e)}")
-            db_status = "unhealthy"
-        
-        health_data = {
-            "status": "healthy" if db_status == "healthy" else "degraded",
-            "message": "API is running",
-            "timestamp": datetime.now().isoformat(),
-            "database": db_status,
-            "version": "1.0.0"
-        }
-        
-        if db_status == "healthy":
-            logger.info("✅ Health check passed - All systems operational")
-        else:
-            logger.warning("⚠️ Health check warning - Database issues detected")
-        
-        return health_data
-        
-    except Exception as e:
-        logger.error(f"❌ Health check failed: {str(e)}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
-        return {
-            "status": "unhealthy",
-            "message": "Health check failed",
-            "timestamp": datetime.now().isoformat(),
-            "error": str(e)
-        }
+    """Health check endpoint, answered from the cached readiness state"""
+    ready, details = health_monitor.readiness()
+    return {
+        "status": "healthy" if ready else "degraded",
+        "message": "API is running",
+        "timestamp": datetime.now().isoformat(),
+        "database": "healthy" if details["database"] == "ok" else "unhealthy",
+        "pool": details.get("pool"),
+        "version": "1.0.0"
+    }
+
+STARTUP_TIMINGS["module_load_ms"] = round((time.perf_counter() - _process_started) * 1000, 2)
 
 if __name__ == "__main__":
     try:
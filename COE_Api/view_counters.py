@@ -0,0 +1,141 @@
+"""In-process buffer for blog view and read counts.
+
+GET /blogs/{blog_id} only increments a dict entry here; nothing is written
+per request. A background thread hands the accumulated counts to ``flush``
+(one batched upsert into blog_view_counts) every ``interval`` seconds, or
+sooner once ``threshold`` increments are pending. Counts from a failed
+flush are merged back and retried on the next one. ``stop`` flushes what is
+left, and an atexit hook does the same if the worker exits without a clean
+shutdown, so at most the counts of a killed process are lost.
+
+At most ``max_blogs`` blog ids are buffered. Increments for further ids,
+including counts merged back after a failed flush, are dropped and counted
+in ``totals["dropped"]``, so a database outage or a flood of reads for
+made-up ids cannot grow the buffer without bound.
+"""
+import atexit
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounterBuffer:
+    """Aggregates (views, reads) per blog id between flushes"""
+
+    def __init__(self, flush, interval: float = 10, threshold: int = 1000, max_blogs: int = 10000):
+        self.flush_counts = flush
+        self.interval = interval
+        self.threshold = threshold
+        self.max_blogs = max_blogs
+        self.counts = {}
+        self.pending = 0
+        self.totals = {"recorded": 0, "flushed": 0, "flushes": 0, "failed_flushes": 0, "dropped": 0}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._atexit_registered = False
+
+    def _entry(self, blog_id: int, increments: int):
+        """The counts for ``blog_id``, or None (counted as dropped) when the
+        buffer is full; caller holds the lock"""
+        entry = self.counts.get(blog_id)
+        if entry is None:
+            if len(self.counts) >= self.max_blogs:
+                self.totals["dropped"] += increments
+                return None
+            entry = self.counts[blog_id] = [0, 0]
+        return entry
+
+    def record(self, blog_id: int, views: int = 0, reads: int = 0) -> bool:
+        """Buffer the increments; False if they were dropped because the buffer is full"""
+        with self._lock:
+            entry = self._entry(blog_id, views + reads)
+            if entry is None:
+                return False
+            entry[0] += views
+            entry[1] += reads
+            self.pending += views + reads
+            self.totals["recorded"] += views + reads
+            full = self.pending >= self.threshold
+        if full:
+            # Flush on the background thread; the request never waits for it
+            self._wake.set()
+        return True
+
+    def view(self, blog_id: int) -> bool:
+        return self.record(blog_id, views=1)
+
+    def read(self, blog_id: int) -> bool:
+        return self.record(blog_id, reads=1)
+
+    def flush(self) -> int:
+        """Write out everything buffered so far and return the number of increments flushed"""
+        with self._flush_lock:
+            with self._lock:
+                counts, self.counts = self.counts, {}
+                pending, self.pending = self.pending, 0
+            if not counts:
+                return 0
+
+            try:
+                flushed = self.flush_counts(counts)
+            except Exception as e:
+                logger.error(f"View counter flush error: {e}")
+                flushed = False
+
+            if flushed:
+                with self._lock:
+                    self.totals["flushes"] += 1
+                    self.totals["flushed"] += pending
+                return pending
+
+            # Keep the counts for the next attempt, as far as the buffer has room
+            kept = 0
+            with self._lock:
+                for blog_id, (views, reads) in counts.items():
+                    entry = self._entry(blog_id, views + reads)
+                    if entry is None:
+                        continue
+                    entry[0] += views
+                    entry[1] += reads
+                    kept += views + reads
+                self.pending += kept
+                self.totals["failed_flushes"] += 1
+            logger.warning(f"View counter flush failed; {kept} increments kept for retry, "
+                           f"{pending - kept} dropped")
+            return 0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="view-counter-flush", daemon=True)
+        self._thread.start()
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+
+    def stop(self):
+        """Stop the flush thread and write out the remaining counts"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            if not self.flush() and self.pending:
+                # The flush failed; back off for a full interval however full the buffer gets
+                self._stop.wait(self.interval)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"pending": self.pending, "buffered_blogs": len(self.counts), **self.totals}
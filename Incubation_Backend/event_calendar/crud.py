@@ -1,3 +1,4 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from . import models, schemas
 import smtplib
@@ -71,6 +72,17 @@ def get_events(db: Session):
         return []
 
 
+def get_table_version(db: Session, table_name: str):
+    try:
+        return db.query(func.coalesce(func.sum(models.ChangeCounter.version), 0)).filter(
+            models.ChangeCounter.table_name == table_name
+        ).scalar()
+    except Exception as e:
+        print(f"Error reading change counter for {table_name}: {e}")
+        db.rollback()
+        return None
+
+
 def update_event(db: Session, event_id: int, event: schemas.EventCreate):
     try:
         db_event = db.query(models.Event).filter(models.Event.id == event_id).first()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -15,4 +15,73 @@ DATABASE_URL = os.getenv(
 
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+
+def install_change_tracking(bind, tables):
+    """Bump change_counters on every statement that writes to ``tables``.
+
+    Versions only ever increase (an upsert fires both the INSERT and UPDATE
+    triggers, so a statement may move them by two). Each table's counter is
+    split over 16 shard rows and a statement bumps the shard of its backend,
+    so concurrent writers do not all queue on one row lock; a table's version
+    is the sum of its shards. Read endpoints hash the counters into ETags, so
+    conditional GETs can be answered without loading rows. Requires the
+    change_counters table from models.ChangeCounter.
+    """
+    with bind.begin() as conn:
+        # Counters created before sharding were keyed on table_name alone;
+        # their version carries over as shard 0
+        conn.execute(text("""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_attribute
+                               WHERE attrelid = 'change_counters'::regclass AND attname = 'shard') THEN
+                    ALTER TABLE change_counters ADD COLUMN shard SMALLINT NOT NULL DEFAULT 0;
+                    ALTER TABLE change_counters DROP CONSTRAINT change_counters_pkey;
+                    ALTER TABLE change_counters ADD PRIMARY KEY (table_name, shard);
+                END IF;
+            END
+            $$;
+        """))
+        conn.execute(text("""
+            CREATE OR REPLACE FUNCTION change_counter_shard() RETURNS SMALLINT AS $$
+                SELECT (pg_backend_pid() % 16)::SMALLINT;
+            $$ LANGUAGE sql STABLE;
+        """))
+        conn.execute(text("""
+            CREATE OR REPLACE FUNCTION bump_change_counter() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO change_counters (table_name, shard, version)
+                VALUES (TG_TABLE_NAME, change_counter_shard(), 1)
+                ON CONFLICT (table_name, shard) DO UPDATE SET version = change_counters.version + 1;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """))
+        for table in tables:
+            conn.execute(text(f"""
+                CREATE OR REPLACE TRIGGER {table}_change_counter
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_change_counter();
+            """))
+
+
+def ping():
+    """SELECT 1 through the engine's pool (used by the background health check)"""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+def pool_state():
+    """Checkout counts from the engine's pool; no database access"""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"class": type(pool).__name__}
+    in_use = pool.checkedout()
+    state = {"in_use": in_use, "idle": pool.checkedin(), "size": pool.size()}
+    max_overflow = getattr(pool, "_max_overflow", -1)
+    if max_overflow >= 0:
+        state["max"] = pool.size() + max_overflow
+        state["available"] = state["max"] - in_use
+    return state
@@ -0,0 +1,89 @@
+"""Liveness and readiness state for the /health probes.
+
+A background thread runs ``SELECT 1`` through the SQLAlchemy engine's pool
+every ``interval`` seconds; readiness reports that cached result together
+with the pool's checkout counts, so probes never query the database.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Periodically refreshed database check plus pool state"""
+
+    def __init__(self, check, pool_state=None, interval: float = 10, stale_after: float = 30):
+        self.check = check
+        self.pool_state = pool_state
+        self.interval = interval
+        self.stale_after = stale_after
+        self.started_at = time.monotonic()
+        self.last_checked = None
+        self.last_ok = None
+        self.latency_ms = None
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def refresh(self):
+        """Run the check once; failures are logged only when the state changes"""
+        started = time.monotonic()
+        try:
+            self.check()
+        except Exception as e:
+            error = str(e).strip() or type(e).__name__
+            if self.error is None:
+                logger.warning(f"Database readiness check failed: {error}")
+            self.error = error
+        else:
+            if self.error is not None:
+                logger.info("Database readiness check recovered")
+            self.error = None
+            self.last_ok = time.monotonic()
+        self.last_checked = time.monotonic()
+        self.latency_ms = round((self.last_checked - started) * 1000, 2)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def liveness(self) -> dict:
+        return {"status": "alive", "uptime_seconds": round(time.monotonic() - self.started_at, 1)}
+
+    def readiness(self):
+        """Return (ready, details) from the last check without querying the database"""
+        now = time.monotonic()
+        database_ok = (self.error is None and self.last_ok is not None
+                       and now - self.last_ok <= self.stale_after)
+        details = {
+            "database": "ok" if database_ok else "unavailable",
+            "last_check_age_seconds": None if self.last_checked is None else round(now - self.last_checked, 1),
+            "check_latency_ms": self.latency_ms,
+        }
+        if self.error:
+            details["error"] = self.error
+
+        ready = database_ok
+        if self.pool_state is not None:
+            pool = self.pool_state()
+            # A saturated pool is reported, not failed: taking a busy but
+            # healthy instance out of rotation would only push its load elsewhere
+            if "available" in pool:
+                pool["saturated"] = pool["available"] <= 0
+            details["pool"] = pool
+            ready = ready and not pool.get("closed")
+        details["status"] = "ready" if ready else "not_ready"
+        return ready, details
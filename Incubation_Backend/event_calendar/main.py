@@ -1,10 +1,45 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from sqlalchemy.orm import Session
 from . import models, schemas, crud, database
+from .health import HealthMonitor
+from .responses import FastJSONResponse, make_etag, not_modified, with_etag
+import os
 
 models.Base.metadata.create_all(bind=database.engine)
+database.install_change_tracking(database.engine, [models.Event.__tablename__])
 
 app = FastAPI()
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Probes read this instead of checking out a connection per request
+health_monitor = HealthMonitor(
+    database.ping,
+    database.pool_state,
+    interval=float(os.getenv("HEALTH_CHECK_INTERVAL", 10))
+)
+
+@app.on_event("startup")
+def start_health_monitor():
+    health_monitor.start()
+
+@app.on_event("shutdown")
+def stop_health_monitor():
+    health_monitor.stop()
+
+@app.get("/health/live")
+def liveness_probe():
+    """Liveness probe: the process is up and serving requests"""
+    return health_monitor.liveness()
+
+@app.get("/health/ready")
+def readiness_probe():
+    """Readiness probe from the cached database check and pool state (no queries)"""
+    ready, details = health_monitor.readiness()
+    return FastJSONResponse(details, status_code=200 if ready else 503)
+
+# Fields serialized by the fast list path, in schemas.Event order
+EVENT_FIELDS = tuple(schemas.Event.model_fields)
 
 def get_db():
     db = database.SessionLocal()
@@ -18,13 +53,23 @@ def create_event(event: schemas.EventCreate, db: Session = Depends(get_db)):
     return crud.create_event(db, event)
 
 @app.get("/events/", response_model=list[schemas.Event])
-def get_events(db: Session = Depends(get_db)):
+def get_events(request: Request, db: Session = Depends(get_db)):
     try:
+        version = crud.get_table_version(db, models.Event.__tablename__)
+        etag = make_etag(request.url.path, version) if version is not None else None
+        cached = etag and not_modified(request, etag)
+        if cached:
+            return cached
+
         events = crud.get_events(db)
         if not events:  
 
             raise HTTPException(status_code=200, detail="No events found in database")
-        return events
+        # ORM rows are trusted, so skip response_model validation and encode directly
+        return with_etag(
+            FastJSONResponse([{field: getattr(event, field) for field in EVENT_FIELDS} for event in events]),
+            etag
+        )
     except HTTPException:
         raise  # re-raise so FastAPI handles it properly
     except Exception as e:
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Time, Text
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Date, Time, Text
 from .database import Base
 
 class Event(Base):
@@ -10,3 +10,10 @@ class Event(Base):
     description = Column(Text, nullable=True)
     event_link = Column(String, nullable=True)
     address = Column(String, nullable=True)
+
+class ChangeCounter(Base):
+    __tablename__ = "change_counters"
+    table_name = Column(String, primary_key=True)
+    # One of 16 rows per table; a table's version is the sum of its shards
+    shard = Column(SmallInteger, primary_key=True, default=0)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,71 @@
+"""Fast JSON and conditional-GET responses for the event calendar.
+
+Returning a FastJSONResponse from an endpoint bypasses response_model
+validation and the jsonable_encoder walk; rows are encoded in one pass by
+orjson when it is installed, with the stdlib json module as a fallback.
+ETags come from models.ChangeCounter, so a matching If-None-Match is answered
+with 304 before events are queried.
+"""
+import hashlib
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _default(obj):
+    """Encode column types that JSON has no native form for"""
+    if isinstance(obj, Decimal):
+        # Same rule as FastAPI's decimal encoder: integral values stay ints
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that serializes rows directly instead of via jsonable_encoder"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from version markers and request parameters"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def not_modified(request: Request, etag: str):
+    """Return a 304 response if the client's If-None-Match already has ``etag``"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    if "*" in candidates or etag in candidates:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
+def with_etag(response: Response, etag) -> Response:
+    if etag is None:
+        return response
+    response.headers["ETag"] = etag
+    # Clients may cache the body but must revalidate it on every use
+    response.headers["Cache-Control"] = "no-cache"
+    return response
@@ -0,0 +1,84 @@
+"""Microbenchmark: positional dict mapping vs. typed rows for task lists.
+
+Compares the old DAO path (a dict per row, then FastAPI's jsonable_encoder and
+stdlib json) with TaskRow objects serialized by RowJSONResponse. No database
+is needed; rows are synthesized in the shape psycopg2 returns them.
+
+    python bench_rows.py [rows]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from rows import TaskRow, dumps
+
+
+def make_raw_rows(count):
+    start = date(2024, 1, 1)
+    created = datetime(2024, 1, 1, 9, 30)
+    return [
+        (i, 1, i % 7, f"Task {i}", "Write the quarterly report " * 3, "Medium", "To Do",
+         start, start + timedelta(days=i % 30), created)
+        for i in range(count)
+    ]
+
+
+def legacy_map(raw):
+    task_list = []
+    for task in raw:
+        task_list.append({
+            "task_id": task[0],
+            "project_id": task[1],
+            "assigned_to": task[2],
+            "title": task[3],
+            "description": task[4],
+            "priority": task[5],
+            "status": task[6],
+            "start_date": task[7],
+            "due_date": task[8],
+            "created_at": task[9]
+        })
+    return task_list
+
+
+def legacy_serialize(task_list):
+    return json.dumps(jsonable_encoder({"message": task_list})).encode("utf-8")
+
+
+def rows_map(raw):
+    return [TaskRow(*task) for task in raw]
+
+
+def rows_serialize(task_list):
+    return dumps({"message": task_list})
+
+
+def measure(label, mapper, serializer, raw, repeat=5):
+    tracemalloc.start()
+    mapped = mapper(raw)
+    _, map_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    map_time = min(_timed(mapper, raw) for _ in range(repeat))
+    ser_time = min(_timed(serializer, mapped) for _ in range(repeat))
+    print(f"{label:<8} map {map_time * 1000:8.2f} ms  serialize {ser_time * 1000:8.2f} ms  "
+          f"peak map memory {map_peak / 1024:8.1f} KiB")
+
+
+def _timed(fn, arg):
+    start = time.perf_counter()
+    fn(arg)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    raw = make_raw_rows(count)
+    assert json.loads(legacy_serialize(legacy_map(raw))) == json.loads(rows_serialize(rows_map(raw)))
+    print(f"{count} task rows")
+    measure("dicts", legacy_map, legacy_serialize, raw)
+    measure("rows", rows_map, rows_serialize, raw)
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+from database import CHANGES_CHANNEL, get_connection_params
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeFeed:
+    """Fan out Postgres NOTIFY change events to in-process subscribers.
+
+    A single background thread holds one LISTEN connection per process and
+    hands every notification to the asyncio loop, where it is copied into the
+    queue of each subscriber whose project filter matches.
+    """
+
+    def __init__(self, channel=CHANGES_CHANNEL, queue_size=100, reconnect_delay=2.0):
+        self.channel = channel
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self._subscribers = {}
+        self._loop = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self, loop):
+        """Start the listener thread, delivering events onto ``loop``"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._loop = loop
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="pm-changefeed", daemon=True)
+        self._thread.start()
+        logger.info(f"Change feed listening on channel '{self.channel}'")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def subscribe(self, project_id=None):
+        """Register a subscriber; ``project_id`` of None receives every event"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[queue] = project_id
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.pop(queue, None)
+
+    def _dispatch(self, event):
+        # Runs on the event loop thread
+        for queue, project_id in list(self._subscribers.items()):
+            if project_id is not None and event.get("project_id") != project_id:
+                continue
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning("Dropping change event for a slow subscriber")
+
+    def _listen(self):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**get_connection_params())
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel};")
+
+                while not self._stop.is_set():
+                    # The timeout only bounds how long stop() waits; notifications wake select immediately
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            event = json.loads(notify.payload)
+                        except ValueError:
+                            logger.warning(f"Ignoring malformed change event: {notify.payload}")
+                            continue
+                        self._loop.call_soon_threadsafe(self._dispatch, event)
+
+            except psycopg2.Error as e:
+                logger.error(f"Change feed connection error: {e}")
+                time.sleep(self.reconnect_delay)
+            except Exception as e:
+                logger.error(f"Unexpected change feed error: {e}")
+                time.sleep(self.reconnect_delay)
+            finally:
+                if conn:
+                    conn.close()
+
+
+change_feed = ChangeFeed()
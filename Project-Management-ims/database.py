@@ -1,9 +1,38 @@
 import psycopg2
 import logging
+import json
+import os
+
+from rows import ProjectRow, TaskRow, PROJECT_COLUMNS, TASK_COLUMNS
 
 # Use the logger configured in main.py instead of setting up a new one
 logger = logging.getLogger(__name__)
 
+# Columns that clients may select on the composite project/tasks read
+PROJECT_FIELDS = ProjectRow.__slots__
+TASK_FIELDS = TaskRow.__slots__
+
+# Tables whose writes bump change_counters
+TRACKED_TABLES = ("projects", "tasks", "task_tags", "task_tag_map")
+
+# Postgres NOTIFY channel that carries project/task change events
+CHANGES_CHANNEL = "pm_changes"
+
+
+def get_connection_params():
+    """Connection settings shared by Database and the change feed listener"""
+    return {
+        "host": os.getenv('DB_HOST', 'localhost'),
+        "database": os.getenv('DB_NAME', 'projectmanagement'),
+        "user": os.getenv('DB_USER', 'imsadmin'),
+        "password": os.getenv('DB_PASSWORD', 'howareyou'),
+        "port": os.getenv('DB_PORT', '5432')
+    }
+
+
+def open_connection():
+    """Plain connection for lightweight checks, without the DDL replay Database() does"""
+    return psycopg2.connect(connect_timeout=5, **get_connection_params())
 
 
 class Database:
@@ -11,22 +40,10 @@ class Database:
         self.conn = None
         self.cursor = None
         try:
-            import os
-            db_host = os.getenv('DB_HOST', 'localhost')
-            db_name = os.getenv('DB_NAME', 'projectmanagement')
-            db_user = os.getenv('DB_USER', 'imsadmin')
-            db_password = os.getenv('DB_PASSWORD', 'howareyou')
-            db_port = os.getenv('DB_PORT', '5432')
-            
-            self.conn = psycopg2.connect(
-                host=db_host,
-                database=db_name,
-                user=db_user,
-                password=db_password,
-                port=db_port
-            )
+            params = get_connection_params()
+            self.conn = psycopg2.connect(**params)
             self.cursor = self.conn.cursor()
-            logger.info(f"Connected to the database successfully at {db_host}:{db_port}")
+            logger.info(f"Connected to the database successfully at {params['host']}:{params['port']}")
             
             # Create tables if they don't exist
             self.create_table()
@@ -57,6 +74,11 @@ class Database:
     def __del__(self):
         self.close_connection()
     
+    def _notify_change(self, cursor, entity, action, project_id, **ids):
+        """Queue a change event; Postgres delivers it to listeners on commit"""
+        payload = {"entity": entity, "action": action, "project_id": project_id, **ids}
+        cursor.execute("SELECT pg_notify(%s, %s)", (CHANGES_CHANNEL, json.dumps(payload)))
+
     def _check_connection(self):
         """Check if database connection is available"""
         if not self.conn or not self.cursor:
@@ -166,28 +188,91 @@ class Database:
 
         
         
+    def create_change_tracking(self):
+        """Install the change_counters table, function and triggers.
+
+        Each writing statement bumps its table's version, so versions only
+        ever increase; an upsert fires both the INSERT and UPDATE triggers and
+        moves it by two. A table's counter is split over 16 shard rows and a
+        statement bumps the shard of its backend, so concurrent writers do not
+        all queue on one row lock; readers sum the shards. List endpoints hash
+        the versions into ETags. Run once at startup, not for every
+        Database() instance.
+        """
+        if not self._check_connection():
+            return False
+
+        try:
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS change_counters (
+                    table_name TEXT NOT NULL,
+                    shard SMALLINT NOT NULL DEFAULT 0,
+                    version BIGINT NOT NULL DEFAULT 0,
+                    PRIMARY KEY (table_name, shard)
+                );
+            """)
+            # Counters created before sharding were keyed on table_name alone;
+            # their version carries over as shard 0
+            self.cursor.execute("""
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (SELECT 1 FROM pg_attribute
+                                   WHERE attrelid = 'change_counters'::regclass AND attname = 'shard') THEN
+                        ALTER TABLE change_counters ADD COLUMN shard SMALLINT NOT NULL DEFAULT 0;
+                        ALTER TABLE change_counters DROP CONSTRAINT change_counters_pkey;
+                        ALTER TABLE change_counters ADD PRIMARY KEY (table_name, shard);
+                    END IF;
+                END
+                $$;
+            """)
+            self.cursor.execute("""
+                CREATE OR REPLACE FUNCTION change_counter_shard() RETURNS SMALLINT AS $$
+                    SELECT (pg_backend_pid() % 16)::SMALLINT;
+                $$ LANGUAGE sql STABLE;
+            """)
+            # Replaced on every start so the sharded version reaches existing databases
+            self.cursor.execute("""
+                CREATE OR REPLACE FUNCTION bump_change_counter() RETURNS trigger AS $$
+                BEGIN
+                    INSERT INTO change_counters (table_name, shard, version)
+                    VALUES (TG_TABLE_NAME, change_counter_shard(), 1)
+                    ON CONFLICT (table_name, shard) DO UPDATE SET version = change_counters.version + 1;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+            """)
+            for table in TRACKED_TABLES:
+                # Only create missing triggers; CREATE TRIGGER locks out writers
+                self.cursor.execute(f"""
+                    DO $$
+                    BEGIN
+                        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = '{table}_change_counter') THEN
+                            CREATE TRIGGER {table}_change_counter
+                            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                            FOR EACH STATEMENT EXECUTE FUNCTION bump_change_counter();
+                        END IF;
+                    END
+                    $$;
+                """)
+            self.conn.commit()
+            logger.info("Change tracking installed")
+            return True
+
+        except psycopg2.Error as e:
+            logger.error(f"Error installing change tracking: {e}")
+            self.conn.rollback()
+            return False
+
     def get_projects(self, user_id=1):
         """Retrieve all projects for a specific user"""
         if not self._check_connection():
             return None
             
         try:
-            self.cursor.execute("""
-                SELECT * FROM projects WHERE owner_id = %s
+            self.cursor.execute(f"""
+                SELECT {PROJECT_COLUMNS} FROM projects WHERE owner_id = %s
             """, (user_id,))
-            projects = self.cursor.fetchall()
-            project_list = []
-            for project in projects:
-                project_list.append({
-                    "project_id": project[0],
-                    "project_name": project[1],
-                    "description": project[2],
-                    "owner_id": project[3],
-                    "start_date": project[4],
-                    "due_date": project[5],
-                    "status": project[6],
-                    "created_at": project[7]
-                })
+            project_list = [ProjectRow(*project) for project in self.cursor.fetchall()]
             logger.info(f"Retrieved {len(project_list)} projects for user {user_id}")
             return project_list
             
@@ -203,25 +288,34 @@ class Database:
             return None
          
             
+    def get_table_versions(self, tables):
+        """Current change_counters versions for ``tables`` (sum of the shards, 0 if never written)"""
+        if not self._check_connection():
+            return None
+
+        try:
+            self.cursor.execute("""
+                SELECT table_name, SUM(version)::BIGINT FROM change_counters
+                WHERE table_name = ANY(%s) GROUP BY table_name
+            """, (list(tables),))
+            versions = dict(self.cursor.fetchall())
+            return [versions.get(table, 0) for table in tables]
+
+        except psycopg2.Error as e:
+            logger.error(f"Error reading change counters for {tables}: {e}")
+            self.conn.rollback()
+            return None
+
     def get_project(self, user_id=1, project_id=1):
         """Retrieve a specific project by ID for a user"""
         try:
-            self.cursor.execute("""
-                SELECT * FROM projects WHERE project_id = %s AND owner_id = %s
+            self.cursor.execute(f"""
+                SELECT {PROJECT_COLUMNS} FROM projects WHERE project_id = %s AND owner_id = %s
             """, (project_id, user_id))
             project = self.cursor.fetchone()
             
             if project:
-                project_data = {
-                    "project_id": project[0],
-                    "project_name": project[1],
-                    "description": project[2],
-                    "owner_id": project[3],
-                    "start_date": project[4],
-                    "due_date": project[5],
-                    "status": project[6],
-                    "created_at": project[7]
-                }
+                project_data = ProjectRow(*project)
                 logger.info(f"Retrieved project {project_id} for user {user_id}")
                 return project_data
             else:
@@ -247,12 +341,16 @@ class Database:
                 self.cursor.execute("""
                     INSERT INTO projects (project_name, description, owner_id, due_date, start_date) 
                     VALUES (%s, %s, %s, %s, CURRENT_DATE)
+                    RETURNING project_id
                 """, (projectname, description, owner_id, due_date))
             else:
                 self.cursor.execute("""
                     INSERT INTO projects (project_name, description, owner_id, start_date) 
                     VALUES (%s, %s, %s, CURRENT_DATE)
+                    RETURNING project_id
                 """, (projectname, description, owner_id))
+            project_id = self.cursor.fetchone()[0]
+            self._notify_change(self.cursor, "project", "created", project_id)
             self.conn.commit()
             logger.info(f"Project '{projectname}' created successfully for user {owner_id}")
             return True
@@ -271,11 +369,16 @@ class Database:
         """Update the status of a project"""
         try:
             with self.cursor as cursor:
+                # project_id may arrive as a JSON string; the event carries the
+                # stored integer so project-filtered subscribers match it
                 cursor.execute("""
-                    UPDATE projects SET status = %s WHERE project_id = %s
+                    UPDATE projects SET status = %s WHERE project_id = %s RETURNING project_id
                 """, (status, project_id))
+                updated = cursor.fetchone()
+                if updated:
+                    self._notify_change(cursor, "project", "updated", updated[0])
             self.conn.commit()
-            if cursor.rowcount == 0:
+            if not updated:
                     logger.warning(f"No project found with ID {project_id} to update")
                     return False
                     
@@ -297,7 +400,10 @@ class Database:
                 cursor.execute("""
                     INSERT INTO tasks (project_id, title, description, priority, status, due_date, assigned_to)
                     VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    RETURNING task_id
                 """, (project_id, title, description, priority, status, due_date, assigned_to))
+                task_id = cursor.fetchone()[0]
+                self._notify_change(cursor, "task", "created", project_id, task_id=task_id)
             self.conn.commit()
             logger.info(f"Task '{title}' added to project {project_id}")
             return True
@@ -315,11 +421,22 @@ class Database:
         """Delete a project and all associated tasks"""
         try:
             with self.cursor as cursor:
+                # Delete the tasks first (rather than leaving them to the cascade)
+                # so each one gets its own event
                 cursor.execute("""
-                    DELETE FROM projects WHERE project_id = %s
+                    DELETE FROM tasks WHERE project_id = %s RETURNING project_id, task_id
                 """, (project_id,))
+                tasks = cursor.fetchall()
+                cursor.execute("""
+                    DELETE FROM projects WHERE project_id = %s RETURNING project_id
+                """, (project_id,))
+                deleted = cursor.fetchone()
+                if deleted:
+                    for task_project_id, task_id in tasks:
+                        self._notify_change(cursor, "task", "deleted", task_project_id, task_id=task_id)
+                    self._notify_change(cursor, "project", "deleted", deleted[0])
             self.conn.commit()
-            if cursor.rowcount == 0:
+            if not deleted:
                     logger.warning(f"No project found with ID {project_id} to delete")
                     return False
                     
@@ -339,10 +456,13 @@ class Database:
         try:
             with self.cursor as cursor:
                 cursor.execute("""
-                    DELETE FROM tasks WHERE task_id = %s
+                    DELETE FROM tasks WHERE task_id = %s RETURNING project_id
                 """, (task_id,))
+                deleted = cursor.fetchone()
+                if deleted:
+                    self._notify_change(cursor, "task", "deleted", deleted[0], task_id=task_id)
             self.conn.commit()
-            if cursor.rowcount == 0:
+            if not deleted:
                     logger.warning(f"No task found with ID {task_id} to delete")
                     return False
                     
@@ -361,24 +481,10 @@ class Database:
     def get_tasks(self, project_id):
         """Get all tasks for a specific project"""
         try:
-            self.cursor.execute("""
-                SELECT * FROM tasks WHERE project_id = %s
+            self.cursor.execute(f"""
+                SELECT {TASK_COLUMNS} FROM tasks WHERE project_id = %s
             """, (project_id,))
-            tasks = self.cursor.fetchall()
-            task_list = []
-            for task in tasks:
-                task_list.append({
-                    "task_id": task[0],
-                    "project_id": task[1],
-                    "assigned_to": task[2],
-                    "title": task[3],
-                    "description": task[4],
-                    "priority": task[5],
-                    "status": task[6],
-                    "start_date": task[7],
-                    "due_date": task[8],
-                    "created_at": task[9]
-                })
+            task_list = [TaskRow(*task) for task in self.cursor.fetchall()]
             logger.info(f"Retrieved {len(task_list)} tasks for project {project_id}")
             return task_list
             
@@ -394,24 +500,13 @@ class Database:
     def get_task(self, task_id,project_id):
         """Get a specific task by ID"""
         try:
-            self.cursor.execute("""
-                SELECT * FROM tasks WHERE task_id = %s AND project_id = %s
+            self.cursor.execute(f"""
+                SELECT {TASK_COLUMNS} FROM tasks WHERE task_id = %s AND project_id = %s
             """, (task_id,project_id))
             task = self.cursor.fetchone()
             
             if task:
-                task_data = {
-                    "task_id": task[0],
-                    "project_id": task[1],
-                    "assigned_to": task[2],
-                    "title": task[3],
-                    "description": task[4],
-                    "priority": task[5],
-                    "status": task[6],
-                    "start_date": task[7],
-                    "due_date": task[8],
-                    "created_at": task[9]
-                }
+                task_data = TaskRow(*task)
                 logger.info(f"Retrieved task {task_id}")
                 return task_data
             else:
@@ -427,15 +522,77 @@ class Database:
             self.conn.rollback()
             return None
 
+    def get_project_with_tasks(self, project_id, user_id=1, project_fields=None, task_fields=None, include_tags=False):
+        """Get a project with its tasks (and optionally tags) in a single query.
+
+        The project row, its tasks and their tag names are assembled into one
+        JSON document by Postgres, so callers get everything in one round trip.
+        ``project_fields`` and ``task_fields`` restrict the returned keys and
+        must be subsets of PROJECT_FIELDS and TASK_FIELDS.
+        """
+        if not self._check_connection():
+            return None
+
+        project_fields = project_fields or PROJECT_FIELDS
+        task_fields = task_fields or TASK_FIELDS
+        # Field names are interpolated into the query, so only known columns are allowed
+        if not set(project_fields) <= set(PROJECT_FIELDS) or not set(task_fields) <= set(TASK_FIELDS):
+            logger.warning(f"Rejected unknown fields for project {project_id}")
+            return None
+
+        task_pairs = [f"'{field}', t.{field}" for field in task_fields]
+        if include_tags:
+            task_pairs.append("""'tags', COALESCE((
+                        SELECT json_agg(tt.tag_name ORDER BY tt.tag_name)
+                        FROM task_tag_map m
+                        JOIN task_tags tt ON tt.tag_id = m.tag_id
+                        WHERE m.task_id = t.task_id
+                    ), '[]'::json)""")
+        project_pairs = [f"'{field}', p.{field}" for field in project_fields]
+
+        try:
+            self.cursor.execute(f"""
+                SELECT json_build_object(
+                    {', '.join(project_pairs)},
+                    'tasks', COALESCE((
+                        SELECT json_agg(json_build_object({', '.join(task_pairs)}) ORDER BY t.task_id)
+                        FROM tasks t
+                        WHERE t.project_id = p.project_id
+                    ), '[]'::json)
+                )
+                FROM projects p
+                WHERE p.project_id = %s AND p.owner_id = %s
+            """, (project_id, user_id))
+            row = self.cursor.fetchone()
+
+            if row:
+                logger.info(f"Retrieved project {project_id} with {len(row[0]['tasks'])} tasks for user {user_id}")
+                return row[0]
+            else:
+                logger.warning(f"Project {project_id} not found for user {user_id}")
+                return None
+
+        except psycopg2.Error as e:
+            logger.error(f"Error retrieving project {project_id} with tasks: {e}")
+            self.conn.rollback()
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving project with tasks: {e}")
+            self.conn.rollback()
+            return None
+
     def update_task_status(self, task_id, status):
         """Update the status of a task"""
         try:
             with self.cursor as cursor:
                 cursor.execute("""
-                    UPDATE tasks SET status = %s WHERE task_id = %s
+                    UPDATE tasks SET status = %s WHERE task_id = %s RETURNING project_id
                 """, (status, task_id))
+                updated = cursor.fetchone()
+                if updated:
+                    self._notify_change(cursor, "task", "updated", updated[0], task_id=task_id)
             self.conn.commit()
-            if cursor.rowcount == 0:
+            if not updated:
                     logger.warning(f"No task found with ID {task_id} to update")
                     return False
                     
@@ -481,13 +638,16 @@ class Database:
                 return False
                 
             values.append(task_id)
-            query = f"UPDATE tasks SET {', '.join(update_fields)} WHERE task_id = %s"
+            query = f"UPDATE tasks SET {', '.join(update_fields)} WHERE task_id = %s RETURNING project_id"
             
             with self.cursor as cursor:
                 cursor.execute(query, values)
+                updated = cursor.fetchone()
+                if updated:
+                    self._notify_change(cursor, "task", "updated", updated[0], task_id=task_id)
             self.conn.commit()
             
-            if cursor.rowcount == 0:
+            if not updated:
                 logger.warning(f"No task found with ID {task_id} to update")
                 return False
                 
@@ -1,9 +1,16 @@
 from fastapi import FastAPI, Request, HTTPException
-from database import Database
+from database import Database, PROJECT_FIELDS, TASK_FIELDS, open_connection
+from changefeed import change_feed
+from rows import RowJSONResponse
+from health import ConnectionProbe, HealthMonitor
+from responses import SelectiveGZipMiddleware, make_etag, not_modified, with_etag
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import json
 import logging
+import os
 import time
 
 app = FastAPI()
@@ -14,6 +21,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],  
 )
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1024, exclude_paths=["/stream/changes"])
 
 logging.basicConfig(
     level=logging.INFO,
@@ -52,6 +60,32 @@ async def log_requests(request: Request, call_next):
 
     return response
 
+# Probes read this instead of building a Database() per request
+health_monitor = HealthMonitor(
+    ConnectionProbe(open_connection),
+    interval=float(os.getenv("HEALTH_CHECK_INTERVAL", 10))
+)
+
+def install_change_tracking():
+    """Create the change_counters triggers once per process instead of per request"""
+    db = Database()
+    try:
+        db.create_change_tracking()
+    finally:
+        db.close_connection()
+
+@app.on_event("startup")
+async def start_change_feed():
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, install_change_tracking)
+    change_feed.start(loop)
+    health_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_change_feed():
+    change_feed.stop()
+    health_monitor.stop()
+
 @app.get("/")
 async def root():
     return {"message": "Hello World"}   
@@ -97,13 +131,19 @@ class TaskUpdate(BaseModel):
     assigned_to: int = None
 
 @app.get("/projects")
-async def get_projects():
+async def get_projects(request: Request):
     db = None
     try:
         db = Database()
+        versions = db.get_table_versions(["projects"])
+        etag = make_etag(request.url.path, *versions) if versions is not None else None
+        cached = etag and not_modified(request, etag)
+        if cached:
+            return cached
+
         logging.info("Fetching all projects")
         projects = db.get_projects()
-        return {"message": projects}
+        return with_etag(RowJSONResponse(content={"message": projects}), etag)
     except Exception as e:
         logging.error(f"Database error fetching projects: {e}")
         return JSONResponse(content={"error": "Database error occurred"}, status_code=500)
@@ -120,7 +160,7 @@ async def get_project(project_id: int):
         logging.info(f"Fetching project with ID: {project_id}")
         project = db.get_project(project_id=project_id)
         if project:
-            return {"message": project}
+            return RowJSONResponse(content={"message": project})
         else:
             return JSONResponse(content={"error": "Project not found"}, status_code=404)
     except Exception as e:
@@ -209,7 +249,7 @@ async def get_project_tasks(project_id: int):
         logging.info(f"Fetching tasks for project {project_id}")
         tasks = db.get_tasks(project_id=project_id)
         if tasks is not None:
-            return {"message": tasks}
+            return RowJSONResponse(content={"message": tasks})
         else:
             return JSONResponse(content={"error": "Failed to fetch tasks"}, status_code=500)
     except Exception as e:
@@ -219,6 +259,42 @@ async def get_project_tasks(project_id: int):
         if db:
             db.close_connection()
 
+@app.get("/projects/{project_id}/full")
+async def get_project_with_tasks(project_id: int, project_fields: str = None, task_fields: str = None, include_tags: bool = False):
+    """Get a project together with its tasks in one request.
+
+    project_fields / task_fields take comma separated column names, e.g.
+    task_fields=task_id,title,status to skip descriptions.
+    """
+    selected_project_fields = [f.strip() for f in project_fields.split(",") if f.strip()] if project_fields else None
+    selected_task_fields = [f.strip() for f in task_fields.split(",") if f.strip()] if task_fields else None
+
+    unknown = set(selected_project_fields or []) - set(PROJECT_FIELDS)
+    unknown |= set(selected_task_fields or []) - set(TASK_FIELDS)
+    if unknown:
+        return JSONResponse(content={"error": f"Unknown fields: {', '.join(sorted(unknown))}"}, status_code=400)
+
+    db = None
+    try:
+        db = Database()
+        logging.info(f"Fetching project {project_id} with tasks")
+        project = db.get_project_with_tasks(
+            project_id=project_id,
+            project_fields=selected_project_fields,
+            task_fields=selected_task_fields,
+            include_tags=include_tags
+        )
+        if project:
+            return {"message": project}
+        else:
+            return JSONResponse(content={"error": "Project not found"}, status_code=404)
+    except Exception as e:
+        logging.error(f"Database error fetching project {project_id} with tasks: {e}")
+        return JSONResponse(content={"error": "Database error occurred"}, status_code=500)
+    finally:
+        if db:
+            db.close_connection()
+
 @app.get("/tasks/{task_id}/{project_id}")
 async def get_task(task_id: int,project_id: int):
     db = None
@@ -228,7 +304,7 @@ async def get_task(task_id: int,project_id: int):
         
         task = db.get_task(task_id=task_id,project_id=project_id)
         if task:
-            return {"message": task}
+            return RowJSONResponse(content={"message": task})
         else:
             return JSONResponse(content={"error": "Task not found"}, status_code=404)
     except Exception as e:
@@ -308,25 +384,61 @@ async def delete_task(request: Request):
         if db:
             db.close_connection()
 
+# Change feed
+
+@app.get("/stream/changes")
+async def stream_changes(request: Request, project_id: int = None):
+    """Server-sent events stream of project and task changes.
+
+    Pass project_id to receive only events for that project. A comment line is
+    sent every 15 seconds so proxies keep the connection open.
+    """
+    queue = change_feed.subscribe(project_id)
+    logging.info(f"Change feed subscriber connected (project: {project_id or 'all'})")
+
+    async def event_stream():
+        try:
+            yield "retry: 1000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['entity']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            change_feed.unsubscribe(queue)
+            logging.info(f"Change feed subscriber disconnected (project: {project_id or 'all'})")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Additional utility endpoints
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    db = None
-    try:
-        # Test database connection
-        db = Database()
+    """Health check endpoint, answered from the cached readiness state"""
+    ready, details = health_monitor.readiness()
+    if ready:
         return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        logging.error(f"Health check failed: {e}")
-        return JSONResponse(
-            content={"status": "unhealthy", "database": "disconnected", "error": str(e)}, 
-            status_code=500
-        )
-    finally:
-        if db:
-            db.close_connection()
+    return JSONResponse(
+        content={"status": "unhealthy", "database": "disconnected", "error": details.get("error")},
+        status_code=500
+    )
+
+@app.get("/health/live")
+async def liveness_probe():
+    """Liveness probe: the process is up and serving requests"""
+    return health_monitor.liveness()
+
+@app.get("/health/ready")
+async def readiness_probe():
+    """Readiness probe from the last background SELECT 1 (never opens a connection)"""
+    ready, details = health_monitor.readiness()
+    return JSONResponse(content=details, status_code=200 if ready else 503)
 
 @app.get("/api/info")
 async def api_info():
@@ -338,6 +450,7 @@ async def api_info():
             "projects": {
                 "GET /projects": "Get all projects",
                 "GET /projects/{project_id}": "Get specific project",
+                "GET /projects/{project_id}/full": "Get project with its tasks (and optional tags) in one call",
                 "POST /create_project": "Create new project",
                 "POST /projectstatus": "Update project status",
                 "POST /delete_project": "Delete project"
@@ -350,9 +463,14 @@ async def api_info():
                 "POST /taskstatus": "Update task status",
                 "POST /delete_task": "Delete task"
             },
+            "changes": {
+                "GET /stream/changes": "Server-sent events for project/task changes (optional ?project_id=)"
+            },
             "utility": {
                 "GET /": "Root endpoint",
                 "GET /health": "Health check",
+                "GET /health/live": "Liveness probe",
+                "GET /health/ready": "Readiness probe (cached database check, 503 when not ready)",
                 "GET /api/info": "API information"
             }
         }
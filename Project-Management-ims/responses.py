@@ -0,0 +1,55 @@
+"""Conditional GET and compression helpers for the project API.
+
+ETags are derived from the change_counters versions maintained by triggers
+(see Database.create_table), so a matching If-None-Match is answered with 304
+before any project or task rows are read.
+"""
+import hashlib
+
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.middleware.gzip import GZipMiddleware
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from version markers and request parameters"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def not_modified(request: Request, etag: str):
+    """Return a 304 response if the client's If-None-Match already has ``etag``"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    if "*" in candidates or etag in candidates:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
+def with_etag(response: Response, etag) -> Response:
+    if etag is None:
+        return response
+    response.headers["ETag"] = etag
+    # Clients may cache the body but must revalidate it on every use
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip middleware that leaves streaming paths (server-sent events) alone.
+
+    Starlette's gzip buffers inside the compressor, which would hold SSE
+    messages back until enough output accumulates.
+    """
+
+    def __init__(self, app, exclude_paths=(), **kwargs):
+        super().__init__(app, **kwargs)
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,72 @@
+"""Typed rows for the project management tables.
+
+Each row type is a slotted dataclass whose field order doubles as the explicit
+SELECT column list, so rows are built straight from cursor tuples and adding a
+column to a table no longer shifts positional indexes.
+"""
+import json
+from dataclasses import dataclass, is_dataclass
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+@dataclass(slots=True)
+class ProjectRow:
+    project_id: int
+    project_name: str
+    description: str
+    owner_id: int
+    start_date: date
+    due_date: date
+    status: str
+    created_at: datetime
+
+
+@dataclass(slots=True)
+class TaskRow:
+    task_id: int
+    project_id: int
+    assigned_to: int
+    title: str
+    description: str
+    priority: str
+    status: str
+    start_date: date
+    due_date: date
+    created_at: datetime
+
+
+PROJECT_COLUMNS = ", ".join(ProjectRow.__slots__)
+TASK_COLUMNS = ", ".join(TaskRow.__slots__)
+
+
+def _default(obj):
+    """Encoder hook for row objects (stdlib only) and values without a JSON form"""
+    if is_dataclass(obj) and hasattr(obj, "__slots__"):
+        return {name: getattr(obj, name) for name in obj.__slots__}
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content):
+    """Serialize content that may contain row objects to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class RowJSONResponse(JSONResponse):
+    """JSONResponse that serializes row objects directly, skipping jsonable_encoder"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
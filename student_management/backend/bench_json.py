@@ -0,0 +1,61 @@
+"""Benchmark: default FastAPI JSON path vs. FastJSONResponse on list payloads.
+
+Builds an /admin/students/all style payload (dict(zip(columns, row)) rows with
+timestamptz and numeric values) and measures how many responses per second
+each path can render. No database or server is needed.
+
+    python bench_json.py [rows]
+"""
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from responses import FastJSONResponse
+
+COLUMNS = ["id", "email", "password_hash", "full_name", "phone", "batch_year",
+           "department", "status", "created_at", "updated_at", "score"]
+
+
+def make_payload(count):
+    now = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+    rows = [
+        (i, f"student{i}@example.edu", "x" * 60, f"Student {i}", "+91-9000000000",
+         2020 + i % 5, "Computer Science", "active", now, now, Decimal("87.25"))
+        for i in range(count)
+    ]
+    return {"total_students": len(rows), "students": [dict(zip(COLUMNS, row)) for row in rows]}
+
+
+def default_path(payload):
+    # What FastAPI does for a plain dict return value
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def fast_path(payload):
+    return FastJSONResponse(payload).body
+
+
+def throughput(fn, payload, seconds=2.0):
+    done = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn(payload)
+        done += 1
+    return done / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    payload = make_payload(count)
+    assert json.loads(default_path(payload)) == json.loads(fast_path(payload))
+
+    default_rps = throughput(default_path, payload)
+    fast_rps = throughput(fast_path, payload)
+    print(f"{count} rows per response")
+    print(f"jsonable_encoder + json: {default_rps:8.1f} responses/s")
+    print(f"FastJSONResponse:        {fast_rps:8.1f} responses/s ({fast_rps / default_rps:.1f}x)")
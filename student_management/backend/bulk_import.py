@@ -0,0 +1,181 @@
+"""Streaming CSV / NDJSON import for the onboarding endpoints.
+
+Rows are decoded and validated as the request body arrives, then loaded in
+batches with one multi-row ``INSERT ... ON CONFLICT (email) DO UPDATE`` per
+batch, so a term's worth of students costs a few round trips instead of one
+connection and commit per person. Every input row gets an entry in the
+report: created, updated, invalid, failed or skipped.
+"""
+import codecs
+import csv
+import json
+from collections import deque
+
+from psycopg2.extras import execute_values
+from pydantic import ValidationError
+
+BATCH_SIZE = 500
+
+
+async def iter_lines(chunks):
+    """Yield decoded text lines from an async iterator of byte chunks"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending.strip():
+        yield pending.rstrip("\r")
+
+
+class LineFeed:
+    """Line iterator for a csv.reader that is filled one whole record at a time"""
+
+    def __init__(self):
+        self.lines = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def iter_records(chunks, fmt: str, list_fields=()):
+    """Yield (row_number, record) pairs from a CSV or NDJSON body.
+
+    Row numbers are 1-based data rows (the CSV header is not counted). A row
+    that cannot be parsed yields a ValueError instead of a dict. Empty CSV
+    cells are omitted and ``list_fields`` cells are split on ';'.
+
+    CSV lines go through a single csv.reader, so a quoted field may span
+    lines. Lines are queued until the quotes balance and the reader is then
+    asked for exactly one record, so it never runs out of input mid-record.
+    """
+    header = None
+    row_number = 0
+    feed = LineFeed()
+    reader = csv.reader(feed)
+    quotes = 0
+    async for line in iter_lines(chunks):
+        if fmt == "csv":
+            if not feed.lines and not line.strip():
+                continue
+            feed.lines.append(line + "\n")
+            quotes += line.count('"')
+            if quotes % 2:
+                # Inside a quoted field; the record continues on the next line
+                continue
+            quotes = 0
+            values = next(reader)
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            row_number += 1
+            if len(values) != len(header):
+                yield row_number, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+                continue
+            record = {}
+            for name, value in zip(header, values):
+                value = value.strip()
+                if not value:
+                    # Leave empty cells out so the model defaults apply
+                    continue
+                if name in list_fields:
+                    record[name] = [item.strip() for item in value.split(";") if item.strip()]
+                else:
+                    record[name] = value
+            yield row_number, record
+        else:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row_number, ValueError(f"Invalid JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield row_number, ValueError("Each line must be a JSON object")
+                continue
+            yield row_number, record
+
+    if feed.lines and header is not None:
+        yield row_number + 1, ValueError("Unterminated quoted field at end of input")
+
+
+def validate(model, record):
+    """Return (model instance, None) or (None, error message)"""
+    if isinstance(record, Exception):
+        return None, str(record)
+    try:
+        return model.model_validate(record), None
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        )
+
+
+def upsert_sql(table: str, columns) -> str:
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column != "email")
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s "
+        f"ON CONFLICT (email) DO UPDATE SET {updates}, updated_at = now() "
+        # xmax is 0 only on freshly inserted row versions
+        f"RETURNING id, email, (xmax = 0) AS inserted"
+    )
+
+
+def load_batch(conn, table: str, columns, batch):
+    """Upsert one batch of (row_number, model) pairs and return report entries.
+
+    Duplicate emails within the batch are coalesced, the last row wins. If
+    the multi-row statement fails the batch is replayed row by row so the
+    error is reported against the offending row only.
+    """
+    results = []
+    by_email = {}
+    for row_number, item in batch:
+        email = item.email.strip()
+        if email in by_email:
+            results.append({"row": by_email[email][0], "email": email, "status": "skipped",
+                            "detail": f"Superseded by row {row_number}"})
+        by_email[email] = (row_number, item)
+
+    rows = []
+    for email, (row_number, item) in by_email.items():
+        values = item.model_dump()
+        values["email"] = email
+        rows.append([values[column] for column in columns])
+    row_numbers = {email: row_number for email, (row_number, _) in by_email.items()}
+
+    sql = upsert_sql(table, columns)
+    cur = conn.cursor()
+    try:
+        try:
+            returned = execute_values(cur, sql, rows, page_size=len(rows), fetch=True)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            returned = []
+            for row in rows:
+                email = row[columns.index("email")]
+                try:
+                    returned += execute_values(cur, sql, [row], fetch=True)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    results.append({"row": row_numbers[email], "email": email, "status": "failed",
+                                    "detail": str(e).strip()})
+
+        for record_id, email, inserted in returned:
+            results.append({"row": row_numbers[email], "email": email, "id": record_id,
+                            "status": "created" if inserted else "updated"})
+    finally:
+        cur.close()
+    return results
@@ -1,6 +1,10 @@
 import psycopg2
 import os
 
+# Tables whose writes bump change_counters (see Database.create_change_tracking)
+TRACKED_TABLES = ('students', 'mentors', 'student_certificates', 'events', 'event_participants',
+                  'leaderboard_entries', 'alumni', 'feedbacks')
+
 
 class Database:
     def __init__(self):
@@ -109,9 +113,373 @@ class Database:
                 created_at TIMESTAMPTZ DEFAULT now()
             );
         ''')
+        self.create_event_participation()
+        for table in ('students', 'mentors', 'student_certificates', 'events', 'event_participants',
+                      'leaderboard_entries', 'alumni'):
+            self.ensure_id_sequence(table)
+        self.create_change_tracking()
+        self.create_search_indexes()
+        self.create_student_facets()
+        self.create_feedback_rollups()
         self.conn.commit()
 
+    def ensure_id_sequence(self, table):
+        """Default ``table``.id to a sequence that starts after the existing ids.
+
+        Tables keep accepting explicit ids; the sequence is only used when an
+        insert leaves id out (bulk imports, batch endpoints).
+        """
+        self.cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {table}_id_seq OWNED BY {table}.id;")
+        self.cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq');")
+        self.cursor.execute(
+            f"SELECT setval('{table}_id_seq', COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false);"
+        )
+
+    def create_event_participation(self):
+        """Capacity and seat counts on events, check-in time on participants.
+
+        events.participant_count counts non-cancelled registrations. The
+        registration endpoint claims a seat with a conditional UPDATE of this
+        column, so capacity holds under concurrency without locking the
+        participant rows or counting them.
+        """
+        self.cursor.execute('''
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'events' AND column_name = 'participant_count';
+        ''')
+        backfill = self.cursor.fetchone() is None
+        self.cursor.execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS capacity INT;")
+        self.cursor.execute(
+            "ALTER TABLE events ADD COLUMN IF NOT EXISTS participant_count INT NOT NULL DEFAULT 0;"
+        )
+        self.cursor.execute("ALTER TABLE event_participants ADD COLUMN IF NOT EXISTS checked_in_at TIMESTAMPTZ;")
+        # Attendee listings page through one event's participants by id
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_event_participants_event_id
+            ON event_participants (event_id, id);
+        ''')
+        if backfill:
+            self.cursor.execute('''
+                UPDATE events e SET participant_count = p.count
+                FROM (
+                    SELECT event_id, COUNT(*) AS count FROM event_participants
+                    WHERE status <> 'cancelled' GROUP BY event_id
+                ) p
+                WHERE e.id = p.event_id;
+            ''')
+
+    def create_search_indexes(self):
+        """Indexes behind /admin/search/students and /admin/students/filter.
+
+        Trigram GIN indexes serve ILIKE '%term%' and similarity ranking on
+        names and emails, text_pattern_ops indexes serve prefix typeahead, and
+        plain btrees serve the exact facet filters.
+        """
+        self.cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_students_full_name_trgm
+            ON students USING gin (full_name gin_trgm_ops);
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_students_email_trgm
+            ON students USING gin (email gin_trgm_ops);
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_students_full_name_prefix
+            ON students (lower(full_name) text_pattern_ops);
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_students_email_prefix
+            ON students (lower(email) text_pattern_ops);
+        ''')
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_department ON students (department);")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_status ON students (status);")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_batch_year ON students (batch_year);")
+        # Leaderboard boards are loaded per metric in score order
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_leaderboard_metric_score
+            ON leaderboard_entries (metric, score DESC);
+        ''')
+        # Per-student certificate listings and certificate_data @> containment lookups
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_student_certificates_student
+            ON student_certificates (student_id, issued_at DESC);
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_student_certificates_data
+            ON student_certificates USING gin (certificate_data jsonb_path_ops);
+        ''')
+
+    def create_change_tracking(self):
+        """Per-table change counters, bumped by every statement that writes the table.
+
+        Versions only ever increase, but not by exactly one per statement: an
+        INSERT ... ON CONFLICT DO UPDATE fires both the INSERT and UPDATE
+        triggers. Each table's counter is split over 16 shard rows and a
+        statement bumps the shard of its backend (``change_counter_shard()``),
+        so concurrent writers mostly lock different rows; a table's version is
+        the sum of its shards. List endpoints hash these versions into their
+        ETags, so a conditional GET costs one index range read instead of a
+        table read.
+        """
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS change_counters (
+                table_name TEXT NOT NULL,
+                shard SMALLINT NOT NULL DEFAULT 0,
+                version BIGINT NOT NULL DEFAULT 0,
+                PRIMARY KEY (table_name, shard)
+            );
+        ''')
+        # Counters created before sharding were keyed on table_name alone;
+        # their version carries over as shard 0
+        self.cursor.execute('''
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_attribute
+                               WHERE attrelid = 'change_counters'::regclass AND attname = 'shard') THEN
+                    ALTER TABLE change_counters ADD COLUMN shard SMALLINT NOT NULL DEFAULT 0;
+                    ALTER TABLE change_counters DROP CONSTRAINT change_counters_pkey;
+                    ALTER TABLE change_counters ADD PRIMARY KEY (table_name, shard);
+                END IF;
+            END
+            $$;
+        ''')
+        self.cursor.execute('''
+            CREATE OR REPLACE FUNCTION change_counter_shard() RETURNS SMALLINT AS $$
+                SELECT (pg_backend_pid() % 16)::SMALLINT;
+            $$ LANGUAGE sql STABLE;
+        ''')
+        self.cursor.execute('''
+            CREATE OR REPLACE FUNCTION bump_change_counter() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO change_counters (table_name, shard, version)
+                VALUES (TG_TABLE_NAME, change_counter_shard(), 1)
+                ON CONFLICT (table_name, shard) DO UPDATE SET version = change_counters.version + 1;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        ''')
+        for table in TRACKED_TABLES:
+            self.cursor.execute(f'''
+                CREATE OR REPLACE TRIGGER {table}_change_counter
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_change_counter();
+            ''')
+
+
+    def create_student_facets(self):
+        """Per-value counts of student department, batch_year and status.
+
+        Statement-level triggers fold each write's transition table into
+        student_facet_counts, so the facet endpoints read a few hundred rows
+        instead of running SELECT DISTINCT over students.
+        """
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS student_facet_counts (
+                facet TEXT NOT NULL,
+                value TEXT NOT NULL,
+                count BIGINT NOT NULL,
+                PRIMARY KEY (facet, value)
+            );
+        ''')
+        self.cursor.execute('''
+            CREATE OR REPLACE FUNCTION student_facet_counts_apply() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'TRUNCATE' THEN
+                    DELETE FROM student_facet_counts;
+                    RETURN NULL;
+                END IF;
+
+                -- Rows are applied in key order so concurrent writers lock counts consistently
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO student_facet_counts AS c (facet, value, count)
+                    SELECT f.facet, f.value, COUNT(*)
+                    FROM new_students s
+                    CROSS JOIN LATERAL (VALUES ('department', s.department),
+                                               ('batch_year', s.batch_year::text),
+                                               ('status', s.status)) AS f(facet, value)
+                    WHERE f.value IS NOT NULL
+                    GROUP BY f.facet, f.value
+                    ORDER BY f.facet, f.value
+                    ON CONFLICT (facet, value) DO UPDATE SET count = c.count + EXCLUDED.count;
+                ELSIF TG_OP = 'DELETE' THEN
+                    INSERT INTO student_facet_counts AS c (facet, value, count)
+                    SELECT f.facet, f.value, -COUNT(*)
+                    FROM old_students s
+                    CROSS JOIN LATERAL (VALUES ('department', s.department),
+                                               ('batch_year', s.batch_year::text),
+                                               ('status', s.status)) AS f(facet, value)
+                    WHERE f.value IS NOT NULL
+                    GROUP BY f.facet, f.value
+                    ORDER BY f.facet, f.value
+                    ON CONFLICT (facet, value) DO UPDATE SET count = c.count + EXCLUDED.count;
+                ELSE
+                    -- Updates only touch counts whose value actually changed
+                    INSERT INTO student_facet_counts AS c (facet, value, count)
+                    SELECT f.facet, f.value, SUM(f.delta)
+                    FROM (
+                        SELECT department, batch_year, status, 1 AS delta FROM new_students
+                        UNION ALL
+                        SELECT department, batch_year, status, -1 AS delta FROM old_students
+                    ) s
+                    CROSS JOIN LATERAL (VALUES ('department', s.department, s.delta),
+                                               ('batch_year', s.batch_year::text, s.delta),
+                                               ('status', s.status, s.delta)) AS f(facet, value, delta)
+                    WHERE f.value IS NOT NULL
+                    GROUP BY f.facet, f.value
+                    HAVING SUM(f.delta) <> 0
+                    ORDER BY f.facet, f.value
+                    ON CONFLICT (facet, value) DO UPDATE SET count = c.count + EXCLUDED.count;
+                END IF;
+
+                DELETE FROM student_facet_counts WHERE count <= 0;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        ''')
+
+        self.cursor.execute("SELECT 1 FROM pg_trigger WHERE tgname = 'students_facets_insert';")
+        if self.cursor.fetchone():
+            return
+
+        # First install: create the triggers and backfill in the same transaction
+        self.cursor.execute('''
+            CREATE TRIGGER students_facets_insert AFTER INSERT ON students
+            REFERENCING NEW TABLE AS new_students
+            FOR EACH STATEMENT EXECUTE FUNCTION student_facet_counts_apply();
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER students_facets_update AFTER UPDATE ON students
+            REFERENCING OLD TABLE AS old_students NEW TABLE AS new_students
+            FOR EACH STATEMENT EXECUTE FUNCTION student_facet_counts_apply();
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER students_facets_delete AFTER DELETE ON students
+            REFERENCING OLD TABLE AS old_students
+            FOR EACH STATEMENT EXECUTE FUNCTION student_facet_counts_apply();
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER students_facets_truncate AFTER TRUNCATE ON students
+            FOR EACH STATEMENT EXECUTE FUNCTION student_facet_counts_apply();
+        ''')
+        self.cursor.execute("DELETE FROM student_facet_counts;")
+        self.cursor.execute('''
+            INSERT INTO student_facet_counts (facet, value, count)
+            SELECT f.facet, f.value, COUNT(*)
+            FROM students s
+            CROSS JOIN LATERAL (VALUES ('department', s.department),
+                                       ('batch_year', s.batch_year::text),
+                                       ('status', s.status)) AS f(facet, value)
+            WHERE f.value IS NOT NULL
+            GROUP BY f.facet, f.value;
+        ''')
+
+    def create_feedback_rollups(self):
+        """Daily feedback counts and rating histograms per (target_type, target_id).
+
+        Statement-level triggers fold each write's transition table into
+        feedback_rollups, so the analytics endpoints sum at most one row per
+        target per day instead of scanning feedbacks. Feedback without a
+        target_id is rolled up under target_id 0.
+        """
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS feedback_rollups (
+                target_type TEXT NOT NULL,
+                target_id INTEGER NOT NULL,
+                day DATE NOT NULL,
+                feedback_count BIGINT NOT NULL DEFAULT 0,
+                rating_count BIGINT NOT NULL DEFAULT 0,
+                rating_sum BIGINT NOT NULL DEFAULT 0,
+                rating_1 BIGINT NOT NULL DEFAULT 0,
+                rating_2 BIGINT NOT NULL DEFAULT 0,
+                rating_3 BIGINT NOT NULL DEFAULT 0,
+                rating_4 BIGINT NOT NULL DEFAULT 0,
+                rating_5 BIGINT NOT NULL DEFAULT 0,
+                PRIMARY KEY (target_type, target_id, day)
+            );
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_feedbacks_target
+            ON feedbacks (target_type, target_id);
+        ''')
+
+        def rollup(source):
+            # Fold (row, delta) pairs from ``source`` into feedback_rollups in key order
+            return f'''
+                INSERT INTO feedback_rollups AS r (target_type, target_id, day, feedback_count,
+                    rating_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+                SELECT f.target_type, COALESCE(f.target_id, 0), (f.created_at AT TIME ZONE 'UTC')::date,
+                       SUM(f.delta),
+                       COALESCE(SUM(f.delta) FILTER (WHERE f.rating IS NOT NULL), 0),
+                       COALESCE(SUM(f.delta * f.rating), 0),
+                       COALESCE(SUM(f.delta) FILTER (WHERE f.rating = 1), 0),
+                       COALESCE(SUM(f.delta) FILTER (WHERE f.rating = 2), 0),
+                       COALESCE(SUM(f.delta) FILTER (WHERE f.rating = 3), 0),
+                       COALESCE(SUM(f.delta) FILTER (WHERE f.rating = 4), 0),
+                       COALESCE(SUM(f.delta) FILTER (WHERE f.rating = 5), 0)
+                FROM ({source}) f
+                GROUP BY 1, 2, 3
+                ORDER BY 1, 2, 3
+                ON CONFLICT (target_type, target_id, day) DO UPDATE SET
+                    feedback_count = r.feedback_count + EXCLUDED.feedback_count,
+                    rating_count = r.rating_count + EXCLUDED.rating_count,
+                    rating_sum = r.rating_sum + EXCLUDED.rating_sum,
+                    rating_1 = r.rating_1 + EXCLUDED.rating_1,
+                    rating_2 = r.rating_2 + EXCLUDED.rating_2,
+                    rating_3 = r.rating_3 + EXCLUDED.rating_3,
+                    rating_4 = r.rating_4 + EXCLUDED.rating_4,
+                    rating_5 = r.rating_5 + EXCLUDED.rating_5;
+            '''
+
+        columns = "target_type, target_id, created_at, rating"
+        self.cursor.execute(f'''
+            CREATE OR REPLACE FUNCTION feedback_rollups_apply() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'TRUNCATE' THEN
+                    DELETE FROM feedback_rollups;
+                ELSIF TG_OP = 'INSERT' THEN
+                    {rollup(f"SELECT {columns}, 1 AS delta FROM new_feedbacks")}
+                ELSIF TG_OP = 'DELETE' THEN
+                    {rollup(f"SELECT {columns}, -1 AS delta FROM old_feedbacks")}
+                ELSE
+                    -- EXCEPT ALL drops rows whose rolled-up columns did not change
+                    {rollup(f"(SELECT {columns}, 1 AS delta FROM (SELECT {columns} FROM new_feedbacks "
+                            f"EXCEPT ALL SELECT {columns} FROM old_feedbacks) n) "
+                            f"UNION ALL (SELECT {columns}, -1 AS delta FROM (SELECT {columns} FROM old_feedbacks "
+                            f"EXCEPT ALL SELECT {columns} FROM new_feedbacks) o)")}
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        ''')
+
+        self.cursor.execute("SELECT 1 FROM pg_trigger WHERE tgname = 'feedbacks_rollups_insert';")
+        if self.cursor.fetchone():
+            return
+
+        # First install: create the triggers and backfill in the same transaction
+        self.cursor.execute('''
+            CREATE TRIGGER feedbacks_rollups_insert AFTER INSERT ON feedbacks
+            REFERENCING NEW TABLE AS new_feedbacks
+            FOR EACH STATEMENT EXECUTE FUNCTION feedback_rollups_apply();
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER feedbacks_rollups_update AFTER UPDATE ON feedbacks
+            REFERENCING OLD TABLE AS old_feedbacks NEW TABLE AS new_feedbacks
+            FOR EACH STATEMENT EXECUTE FUNCTION feedback_rollups_apply();
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER feedbacks_rollups_delete AFTER DELETE ON feedbacks
+            REFERENCING OLD TABLE AS old_feedbacks
+            FOR EACH STATEMENT EXECUTE FUNCTION feedback_rollups_apply();
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER feedbacks_rollups_truncate AFTER TRUNCATE ON feedbacks
+            FOR EACH STATEMENT EXECUTE FUNCTION feedback_rollups_apply();
+        ''')
+        self.cursor.execute("DELETE FROM feedback_rollups;")
+        self.cursor.execute(rollup(f"SELECT {columns}, 1 AS delta FROM feedbacks"))
+
 if __name__ == "__main__":
     db = Database()
     db.create_all_tables()
-
@@ -0,0 +1,50 @@
+from psycopg2.extensions import quote_ident
+
+from cache import TTLCache
+
+
+class TableStatistics:
+    """Row counts for every public table, shared by the admin statistics endpoints.
+
+    By default counts come from the planner statistics in pg_class (falling
+    back to pg_stat_user_tables for tables that were never analyzed), read
+    for all tables in a single query. ``exact=True`` runs one UNION ALL of
+    COUNT(*) instead. Both results are cached for ``ttl`` seconds.
+    """
+
+    def __init__(self, connect, ttl: float = 15):
+        self.connect = connect
+        self.cache = TTLCache(ttl=ttl)
+
+    def table_counts(self, exact: bool = False) -> dict:
+        """Return {table_name: row_count} ordered by table name"""
+        key = "exact" if exact else "estimate"
+        counts = self.cache.get(key)
+        if counts is not None:
+            return counts
+
+        conn = self.connect()
+        cur = conn.cursor()
+        try:
+            cur.execute("""
+                SELECT c.relname,
+                       COALESCE(NULLIF(c.reltuples, -1)::bigint, s.n_live_tup, 0) AS row_count
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+                WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p')
+                ORDER BY c.relname;
+            """)
+            counts = {name: max(int(count), 0) for name, count in cur.fetchall()}
+
+            if exact and counts:
+                cur.execute(" UNION ALL ".join(
+                    f"SELECT %s, COUNT(*) FROM {quote_ident(name, cur)}" for name in counts
+                ) + ";", list(counts))
+                counts.update(dict(cur.fetchall()))
+        finally:
+            cur.close()
+            conn.close()
+
+        self.cache.set(key, counts)
+        return counts
@@ -0,0 +1,182 @@
+"""In-memory ranked views of leaderboard_entries, one per metric.
+
+Each metric is kept as a list of (-score, student_id) keys in sorted order,
+so top-K is a slice and a student's rank is a bisect: O(log n) per query
+with no sort per call. A score change is a bisect plus a list delete and
+insert, which shift the tail of the list: O(n) element moves, but done by
+a single memmove, so it stays in the microseconds for boards of a few
+hundred thousand entries and needs no extra dependency. Boards much larger
+than that would want a tree or skip list instead.
+
+Boards are loaded from the (metric, score DESC) index on first use and
+stamped with the leaderboard_entries change counter, the sum of its shard
+rows. A writer locks only its own shard (``lock_version``) before writing and
+reads (total, own shard) again after. Nobody else can move that shard in
+between, so if the total moved by exactly as much as the shard did, the
+write was the only one and boards stamped with the old total are patched in
+place and restamped; otherwise another writer committed in between and
+boards reload on their next read. The counter only ever increases, but not
+necessarily by one per statement (an upsert fires both the INSERT and
+UPDATE triggers).
+"""
+import threading
+from bisect import bisect_left, insort
+
+VERSIONS_SQL = """
+    SELECT COALESCE(SUM(version), 0)::BIGINT,
+           COALESCE(SUM(version) FILTER (WHERE shard = change_counter_shard()), 0)::BIGINT
+    FROM change_counters WHERE table_name = 'leaderboard_entries';
+"""
+
+
+def current_versions(cur):
+    """(total, this connection's shard) versions of leaderboard_entries"""
+    cur.execute(VERSIONS_SQL)
+    total, own = cur.fetchone()
+    return total, own
+
+
+def current_version(cur) -> int:
+    return current_versions(cur)[0]
+
+
+def lock_version(cur):
+    """Lock this connection's leaderboard_entries shard until commit and return
+    ``current_versions``.
+
+    Called before a write; other writers keep to their own shards, so only
+    their commits can move the total without moving ours.
+    """
+    cur.execute("""
+        INSERT INTO change_counters (table_name, shard, version)
+        VALUES ('leaderboard_entries', change_counter_shard(), 0)
+        ON CONFLICT (table_name, shard) DO UPDATE SET version = change_counters.version;
+    """)
+    return current_versions(cur)
+
+
+class RankedBoard:
+    """Scores for one metric, ordered highest first (ties by student_id)"""
+
+    def __init__(self, version: int, rows=()):
+        self.version = version
+        self.scores = {student_id: float(score) for student_id, score in rows}
+        self.keys = sorted((-score, student_id) for student_id, score in self.scores.items())
+
+    def __len__(self):
+        return len(self.keys)
+
+    def set_score(self, student_id: int, score: float):
+        old = self.scores.get(student_id)
+        if old is not None:
+            del self.keys[bisect_left(self.keys, (-old, student_id))]
+        insort(self.keys, (-score, student_id))
+        self.scores[student_id] = score
+
+    def rank_of_score(self, score: float) -> int:
+        """1-based competition rank: one more than the number of higher scores"""
+        return bisect_left(self.keys, (-score,)) + 1
+
+    def entry(self, position: int) -> dict:
+        neg_score, student_id = self.keys[position]
+        return {"rank": self.rank_of_score(-neg_score), "student_id": student_id, "score": -neg_score}
+
+    def top(self, k: int):
+        return [self.entry(position) for position in range(min(k, len(self.keys)))]
+
+    def standing(self, student_id: int):
+        """Rank, percentile and position of ``student_id``, or None if unranked"""
+        score = self.scores.get(student_id)
+        if score is None:
+            return None
+        total = len(self.keys)
+        # Share of entries scoring at or below this student
+        at_or_below = total - bisect_left(self.keys, (-score,))
+        return {
+            "student_id": student_id,
+            "score": score,
+            "rank": self.rank_of_score(score),
+            "percentile": round(100.0 * at_or_below / total, 2),
+            "total": total,
+            "position": bisect_left(self.keys, (-score, student_id)),
+        }
+
+    def neighbors(self, student_id: int, count: int):
+        standing = self.standing(student_id)
+        if standing is None:
+            return None
+        position = standing.pop("position")
+        start = max(position - count, 0)
+        stop = min(position + count + 1, len(self.keys))
+        return standing, [self.entry(i) for i in range(start, stop)]
+
+
+class Leaderboard:
+    """Thread-safe registry of RankedBoards keyed by metric"""
+
+    def __init__(self):
+        self.boards = {}
+        self._lock = threading.Lock()
+
+    def board(self, cur, metric: str) -> RankedBoard:
+        """Return the board for ``metric``, reloading it if the table has moved on"""
+        version = current_version(cur)
+        with self._lock:
+            board = self.boards.get(metric)
+            if board is not None and board.version == version:
+                return board
+
+        # Version and rows come from one statement, so they share a snapshot
+        cur.execute("""
+            SELECT v.version, e.student_id, e.score
+            FROM (SELECT COALESCE(SUM(version), 0)::BIGINT AS version
+                  FROM change_counters WHERE table_name = 'leaderboard_entries') v
+            LEFT JOIN leaderboard_entries e ON e.metric = %s AND e.score IS NOT NULL
+            ORDER BY e.score DESC, e.student_id;
+        """, (metric,))
+        rows = cur.fetchall()
+        board = RankedBoard(rows[0][0], [(sid, score) for _, sid, score in rows if sid is not None])
+        with self._lock:
+            current = self.boards.get(metric)
+            if current is None or current.version <= board.version:
+                self.boards[metric] = board
+        return board
+
+    def top(self, cur, metric: str, k: int):
+        board = self.board(cur, metric)
+        with self._lock:
+            return len(board), board.top(k)
+
+    def standing(self, cur, metric: str, student_id: int):
+        board = self.board(cur, metric)
+        with self._lock:
+            standing = board.standing(student_id)
+        if standing is not None:
+            del standing["position"]
+        return standing
+
+    def neighbors(self, cur, metric: str, student_id: int, count: int):
+        board = self.board(cur, metric)
+        with self._lock:
+            return board.neighbors(student_id, count)
+
+    def apply(self, before, after, updates):
+        """Record a committed write of (metric, student_id, score) rows.
+
+        ``before`` is the (total, own shard) pair from ``lock_version`` and
+        ``after`` the pair read after the write. When only our shard moved,
+        boards stamped with the old total missed nothing else, so they are
+        patched in place; otherwise every board is left to reload itself.
+        """
+        if after[0] - before[0] != after[1] - before[1]:
+            return
+        changed = {}
+        for metric, student_id, score in updates:
+            changed.setdefault(metric, []).append((student_id, float(score)))
+        with self._lock:
+            for metric, board in self.boards.items():
+                if board.version != before[0]:
+                    continue
+                for student_id, score in changed.get(metric, ()):
+                    board.set_score(student_id, score)
+                board.version = after[0]
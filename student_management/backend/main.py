@@ -1,13 +1,22 @@
 import os
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Query
 from pydantic import BaseModel
 import psycopg2
+from psycopg2.extras import execute_values
 import json
 import logging
 import time
+from datetime import date
 import requests
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from responses import FastJSONResponse, make_etag, not_modified, with_etag
+from db_stats import TableStatistics
+from health import ConnectionProbe, HealthMonitor
+import bulk_import
+from leaderboard import Leaderboard, current_versions, lock_version
 
 app = FastAPI()
 app.add_middleware(
@@ -17,6 +26,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"]
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
@@ -33,7 +43,8 @@ async def log_requests(request: Request, call_next):
     
     # Read request body before processing (if needed for logging)
     body = b""
-    if request.method in ["POST", "PUT", "PATCH"]:
+    # Bulk imports are parsed as they stream in, so their bodies are not buffered here
+    if request.method in ["POST", "PUT", "PATCH"] and not request.url.path.endswith("/import"):
         body = await request.body()
         # Create a new request with the body for downstream processing
         async def receive():
@@ -66,26 +77,79 @@ def get_db_connection():
     return conn
 
 
+# Row counts for /admin/statistics and /admin/tables
+table_statistics = TableStatistics(get_db_connection, ttl=15)
+
+# Probes read this instead of opening a connection per request
+health_monitor = HealthMonitor(
+    ConnectionProbe(get_db_connection),
+    interval=float(os.getenv("HEALTH_CHECK_INTERVAL", 10))
+)
+
+
+@app.on_event("startup")
+async def start_health_monitor():
+    health_monitor.start()
+
+
+@app.on_event("shutdown")
+async def stop_health_monitor():
+    health_monitor.stop()
+
+
+def list_etag(cur, request: Request, *tables):
+    """ETag for a read endpoint from the change_counters versions of ``tables``.
+
+    Returns None when change tracking is not installed, in which case the
+    endpoint simply responds without an ETag.
+    """
+    try:
+        cur.execute(
+            "SELECT table_name, SUM(version)::BIGINT FROM change_counters "
+            "WHERE table_name = ANY(%s) GROUP BY table_name;",
+            (list(tables),)
+        )
+        versions = dict(cur.fetchall())
+    except psycopg2.errors.UndefinedTable:
+        cur.connection.rollback()
+        return None
+    return make_etag(request.url.path, request.url.query, *(versions.get(table, 0) for table in tables))
+
+
 @app.get("/")
 async def root():
     return {
         "message": "Student Management System API",
         "version": "2.0.0",
         "endpoints": {
-            "students": "/students/register, /students/{student_id}",
-            "mentors": "/mentors/register, /mentors/{mentor_id}",
-            "events": "/events/create, /events/{event_id}",
-            "student_certificates": "/student_certificates/issue, /student_certificates/{student_certificate_id}",
-            "leaderboard": "/leaderboard/add, /leaderboard/{entry_id}",
-            "alumni": "/alumni/register, /alumni/{alumni_id}",
-            "feedbacks": "/feedbacks/add, /feedbacks/{feedback_id}",
+            "students": "/students/register, /students/import, /students/{student_id}, /students/{student_id}/certificates",
+            "mentors": "/mentors/register, /mentors/import, /mentors/{mentor_id}",
+            "events": "/events/create, /events/{event_id}, /events/{event_id}/register, /events/{event_id}/check-in, /events/{event_id}/participants",
+            "student_certificates": "/student_certificates/issue, /student_certificates/issue/batch, /student_certificates/search, /student_certificates/{student_certificate_id}",
+            "leaderboard": "/leaderboard/add, /leaderboard/increments, /leaderboard/{entry_id}, /leaderboard/{metric}/top, /leaderboard/{metric}/rank/{student_id}, /leaderboard/{metric}/neighbors/{student_id}",
+            "alumni": "/alumni/register, /alumni/register/batch, /alumni/{alumni_id}",
+            "feedbacks": "/feedbacks/add, /feedbacks/{feedback_id}, /feedbacks/analytics/targets/{target_type}, /feedbacks/analytics/targets/{target_type}/{target_id}, /feedbacks/analytics/mentors/{mentor_id}",
+            "health": "/health/live, /health/ready",
             "docs": "/docs"
         },
-        "note": "All endpoints now require manual ID assignment. No auto-generated IDs."
+        "note": "IDs are generated for students, mentors, events, certificates and bulk imports; leaderboard and alumni IDs are optional; feedbacks still take an explicit ID."
     }
 
 
 
+@app.get("/health/live")
+def liveness_probe():
+    """Liveness probe: the process is up and serving requests"""
+    return health_monitor.liveness()
+
+
+@app.get("/health/ready")
+def readiness_probe():
+    """Readiness probe from the last background SELECT 1 (never opens a connection)"""
+    ready, details = health_monitor.readiness()
+    return FastJSONResponse(details, status_code=200 if ready else 503)
+
+
 # -------------------------
 # STUDENTS APIs
 # -------------------------
@@ -149,6 +213,34 @@ async def get_student(student_id: int):
         conn.close()
 
 
+@app.get("/students/{student_id}/certificates")
+def get_student_certificates(request: Request, student_id: int):
+    """All certificates issued to a student, newest first"""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        etag = list_etag(cur, request, "student_certificates")
+        cached = etag and not_modified(request, etag)
+        if cached:
+            return cached
+
+        cur.execute("""
+            SELECT * FROM student_certificates
+            WHERE student_id = %s
+            ORDER BY issued_at DESC, id DESC;
+        """, (student_id,))
+        columns = [desc[0] for desc in cur.description]
+        certificates = [dict(zip(columns, row)) for row in cur.fetchall()]
+        return with_etag(FastJSONResponse({
+            "student_id": student_id,
+            "count": len(certificates),
+            "certificates": certificates
+        }), etag)
+    finally:
+        cur.close()
+        conn.close()
+
+
 # -------------------------
 # EVENTS APIs
 # -------------------------
@@ -158,6 +250,7 @@ class EventCreate(BaseModel):
     starts_at: str = None
     ends_at: str = None
     location: str = None
+    capacity: int = None
     created_by: int  # mentor_id
 
 class Event(BaseModel):
@@ -167,6 +260,7 @@ class Event(BaseModel):
     starts_at: str = None
     ends_at: str = None
     location: str = None
+    capacity: int = None
     created_by: int  # mentor_id
 
 
@@ -178,9 +272,9 @@ async def create_event(event: EventCreate):
     cur = conn.cursor()
     try:
         cur.execute("""
-            INSERT INTO events (title, description, starts_at, ends_at, location, created_by)
-            VALUES (%s, %s, %s, %s, %s, %s) RETURNING id;
-        """, (event.title, event.description, event.starts_at, event.ends_at, event.location, event.created_by))
+            INSERT INTO events (title, description, starts_at, ends_at, location, created_by, capacity)
+            VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id;
+        """, (event.title, event.description, event.starts_at, event.ends_at, event.location, event.created_by, event.capacity))
 
         event_id = cur.fetchone()[0]
         conn.commit()
@@ -212,6 +306,202 @@ async def get_event(event_id: int):
         conn.close()
 
 
+# Event participants: seats are claimed by a conditional UPDATE of
+# events.participant_count in the same statement as the insert, so capacity
+# holds under concurrent registrations without reading the count first.
+class EventRegistration(BaseModel):
+    student_id: int
+    role: str = "attendee"
+
+class EventCheckIn(BaseModel):
+    student_ids: list[int]
+
+MAX_CHECK_IN_BATCH = 5000
+
+
+@app.post("/events/{event_id}/register")
+def register_for_event(event_id: int, registration: EventRegistration):
+    logger.info(f"Registering student {registration.student_id} for event {event_id}")
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            WITH seat AS (
+                UPDATE events SET participant_count = participant_count + 1
+                WHERE id = %(event_id)s AND (capacity IS NULL OR participant_count < capacity)
+                RETURNING id, participant_count, capacity
+            ), registered AS (
+                INSERT INTO event_participants (event_id, student_id, role)
+                SELECT id, %(student_id)s, %(role)s FROM seat
+                ON CONFLICT (event_id, student_id) DO UPDATE
+                SET status = 'registered', role = EXCLUDED.role, registered_at = now(), checked_in_at = NULL
+                WHERE event_participants.status = 'cancelled'
+                RETURNING id
+            )
+            SELECT (SELECT id FROM registered), participant_count, capacity FROM seat;
+        """, {"event_id": event_id, "student_id": registration.student_id, "role": registration.role})
+        row = cur.fetchone()
+
+        if row is None:
+            conn.rollback()
+            cur.execute("SELECT 1 FROM events WHERE id = %s;", (event_id,))
+            if not cur.fetchone():
+                raise HTTPException(status_code=404, detail="Event not found")
+            raise HTTPException(status_code=409, detail="Event is full")
+
+        participant_id, participant_count, capacity = row
+        if participant_id is None:
+            # Already registered: give the seat back by discarding the whole statement
+            conn.rollback()
+            raise HTTPException(status_code=409, detail="Student is already registered for this event")
+
+        conn.commit()
+        logger.info(f"Student {registration.student_id} registered for event {event_id}, id: {participant_id}")
+        return {
+            "message": "Registered for event successfully",
+            "participant_id": participant_id,
+            "participant_count": participant_count,
+            "seats_left": None if capacity is None else capacity - participant_count
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error registering student {registration.student_id} for event {event_id}: {e}")
+        conn.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        cur.close()
+        conn.close()
+
+@app.delete("/events/{event_id}/participants/{student_id}")
+def cancel_event_registration(event_id: int, student_id: int):
+    logger.info(f"Cancelling registration of student {student_id} for event {event_id}")
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            WITH cancelled AS (
+                UPDATE event_participants SET status = 'cancelled'
+                WHERE event_id = %s AND student_id = %s AND status <> 'cancelled'
+                RETURNING event_id
+            )
+            UPDATE events SET participant_count = participant_count - 1
+            WHERE id IN (SELECT event_id FROM cancelled)
+            RETURNING participant_count;
+        """, (event_id, student_id))
+        row = cur.fetchone()
+        if not row:
+            conn.rollback()
+            raise HTTPException(status_code=404, detail="Registration not found")
+        conn.commit()
+        return {"message": "Registration cancelled successfully", "participant_count": row[0]}
+    finally:
+        cur.close()
+        conn.close()
+
+@app.post("/events/{event_id}/check-in")
+def check_in_participants(event_id: int, check_in: EventCheckIn):
+    """Check in a batch of scanned student ids with one UPDATE.
+
+    Each id is reported as checked_in, already_checked_in, cancelled or
+    not_registered.
+    """
+    if len(check_in.student_ids) > MAX_CHECK_IN_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CHECK_IN_BATCH} students per check-in batch")
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        # Both CTEs and the final join read the same snapshot, so p.status is the pre-update status
+        cur.execute("""
+            WITH requested AS (
+                SELECT DISTINCT unnest(%(student_ids)s::int[]) AS student_id
+            ), checked_in AS (
+                UPDATE event_participants SET status = 'checked_in', checked_in_at = now()
+                WHERE event_id = %(event_id)s AND status = 'registered'
+                  AND student_id = ANY(%(student_ids)s::int[])
+                RETURNING student_id
+            )
+            SELECT r.student_id,
+                   CASE WHEN c.student_id IS NOT NULL THEN 'checked_in'
+                        WHEN p.status = 'checked_in' THEN 'already_checked_in'
+                        WHEN p.status = 'cancelled' THEN 'cancelled'
+                        ELSE 'not_registered' END
+            FROM requested r
+            LEFT JOIN checked_in c ON c.student_id = r.student_id
+            LEFT JOIN event_participants p ON p.event_id = %(event_id)s AND p.student_id = r.student_id
+            ORDER BY r.student_id;
+        """, {"event_id": event_id, "student_ids": check_in.student_ids})
+        results = cur.fetchall()
+        conn.commit()
+
+        summary = {status: 0 for status in ("checked_in", "already_checked_in", "cancelled", "not_registered")}
+        for _, status in results:
+            summary[status] += 1
+        logger.info(f"Checked in {summary['checked_in']} participants for event {event_id}")
+        return FastJSONResponse({
+            "event_id": event_id,
+            **summary,
+            "results": [{"student_id": student_id, "status": status} for student_id, status in results]
+        })
+    except Exception as e:
+        logger.error(f"Error checking in participants for event {event_id}: {e}")
+        conn.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        cur.close()
+        conn.close()
+
+@app.get("/events/{event_id}/participants")
+def list_event_participants(
+    request: Request,
+    event_id: int,
+    status: str = None,
+    after_id: int = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Attendees of an event a page at a time (keyset pagination on participant id)"""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        etag = list_etag(cur, request, "event_participants", "students")
+        cached = etag and not_modified(request, etag)
+        if cached:
+            return cached
+
+        conditions = ["p.event_id = %s"]
+        params = [event_id]
+        if status:
+            conditions.append("p.status = %s")
+            params.append(status)
+        if after_id is not None:
+            conditions.append("p.id > %s")
+            params.append(after_id)
+        cur.execute(f"""
+            SELECT p.id, p.student_id, s.full_name, s.email, p.role, p.status,
+                   p.registered_at, p.checked_in_at
+            FROM event_participants p
+            JOIN students s ON s.id = p.student_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY p.id
+            LIMIT %s;
+        """, params + [limit + 1])
+        columns = [desc[0] for desc in cur.description]
+        rows = cur.fetchall()
+        has_more = len(rows) > limit
+        participants = [dict(zip(columns, row)) for row in rows[:limit]]
+
+        return with_etag(FastJSONResponse({
+            "event_id": event_id,
+            "count": len(participants),
+            "next_after_id": participants[-1]["id"] if has_more else None,
+            "participants": participants
+        }), etag)
+    finally:
+        cur.close()
+        conn.close()
+
+
 # -------------------------
 # MENTORS APIs
 # -------------------------
@@ -273,6 +563,70 @@ async def get_mentor(mentor_id: int):
 
 
 
+# -------------------------
+# BULK IMPORT APIs
+# -------------------------
+# Columns written by the onboarding import; email is the upsert key
+IMPORT_COLUMNS = {
+    "students": ["email", "password_hash", "full_name", "phone", "batch_year", "department"],
+    "mentors": ["email", "password_hash", "full_name", "phone", "title", "expertise", "available"],
+}
+
+
+def import_format(request: Request) -> str:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json"):
+        return "ndjson"
+    raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson")
+
+
+async def run_import(request: Request, table: str, model, list_fields=()):
+    """Stream, validate and upsert ``table`` rows, returning a per-row report"""
+    fmt = import_format(request)
+    columns = IMPORT_COLUMNS[table]
+    results = []
+    batch = []
+    conn = await run_in_threadpool(get_db_connection)
+    try:
+        async for row_number, record in bulk_import.iter_records(request.stream(), fmt, list_fields):
+            item, error = bulk_import.validate(model, record)
+            if error:
+                results.append({"row": row_number, "status": "invalid", "detail": error})
+                continue
+            batch.append((row_number, item))
+            if len(batch) >= bulk_import.BATCH_SIZE:
+                results += await run_in_threadpool(bulk_import.load_batch, conn, table, columns, batch)
+                batch = []
+        if batch:
+            results += await run_in_threadpool(bulk_import.load_batch, conn, table, columns, batch)
+    finally:
+        conn.close()
+
+    results.sort(key=lambda result: result["row"])
+    summary = {status: 0 for status in ("created", "updated", "invalid", "failed", "skipped")}
+    for result in results:
+        summary[result["status"]] += 1
+    logger.info(f"Imported {table}: {summary}")
+    return FastJSONResponse({"table": table, "total_rows": len(results), **summary, "results": results})
+
+
+@app.post("/students/import")
+async def import_students(request: Request):
+    """Bulk register or update students from a CSV or NDJSON body (upsert on email)"""
+    return await run_import(request, "students", StudentRegistration)
+
+
+@app.post("/mentors/import")
+async def import_mentors(request: Request):
+    """Bulk register or update mentors from a CSV or NDJSON body (upsert on email).
+
+    In CSV the expertise column is a ';' separated list.
+    """
+    return await run_import(request, "mentors", MentorRegistration, list_fields=("expertise",))
+
+
 # -------------------------
 # STUDENT CERTIFICATES APIs
 # -------------------------
@@ -313,6 +667,100 @@ async def issue_student_certificate(student_certificate: StudentCertificateCreat
         cur.close()
         conn.close()
 
+class StudentCertificateBatch(BaseModel):
+    certificates: list[StudentCertificateCreate]
+
+MAX_CERTIFICATE_BATCH = 10000
+
+@app.post("/student_certificates/issue/batch")
+def issue_student_certificates_batch(batch: StudentCertificateBatch):
+    """Issue many certificates in one transaction; either all are issued or none"""
+    if not batch.certificates:
+        raise HTTPException(status_code=400, detail="No certificates to issue")
+    if len(batch.certificates) > MAX_CERTIFICATE_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CERTIFICATE_BATCH} certificates per batch")
+
+    logger.info(f"Issuing {len(batch.certificates)} student certificates")
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        rows = [
+            (c.student_id, c.certificate_title, c.description, c.issued_by,
+             json.dumps(c.certificate_data) if c.certificate_data else None)
+            for c in batch.certificates
+        ]
+        issued = execute_values(cur, """
+            INSERT INTO student_certificates (student_id, certificate_title, description, issued_by, certificate_data)
+            VALUES %s RETURNING id, student_id;
+        """, rows, template="(%s, %s, %s, %s, %s::jsonb)", page_size=len(rows), fetch=True)
+        conn.commit()
+        logger.info(f"Issued {len(issued)} student certificates")
+        return FastJSONResponse({
+            "message": "Student certificates issued successfully",
+            "issued": len(issued),
+            "certificates": [
+                {"student_certificate_id": sc_id, "student_id": student_id} for sc_id, student_id in issued
+            ]
+        })
+    except Exception as e:
+        logger.error(f"Error issuing student certificate batch: {e}")
+        conn.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        cur.close()
+        conn.close()
+
+# Declared before /student_certificates/{student_certificate_id} so "search" is not read as an id
+@app.get("/student_certificates/search")
+def search_student_certificates(
+    data: str,
+    student_id: int = None,
+    after_id: int = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Certificates whose certificate_data contains the given JSON object.
+
+    For example ``data={"program": "AI Bootcamp", "grade": "A"}``; served by
+    the jsonb_path_ops GIN index on certificate_data.
+    """
+    try:
+        document = json.loads(data)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="data must be a JSON object")
+    if not isinstance(document, dict):
+        raise HTTPException(status_code=400, detail="data must be a JSON object")
+
+    conditions = ["certificate_data @> %s::jsonb"]
+    params = [json.dumps(document)]
+    if student_id is not None:
+        conditions.append("student_id = %s")
+        params.append(student_id)
+    if after_id is not None:
+        conditions.append("id > %s")
+        params.append(after_id)
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            SELECT * FROM student_certificates
+            WHERE {' AND '.join(conditions)}
+            ORDER BY id
+            LIMIT %s;
+        """, params + [limit + 1])
+        columns = [desc[0] for desc in cur.description]
+        rows = cur.fetchall()
+        has_more = len(rows) > limit
+        certificates = [dict(zip(columns, row)) for row in rows[:limit]]
+        return FastJSONResponse({
+            "count": len(certificates),
+            "next_after_id": certificates[-1]["id"] if has_more else None,
+            "certificates": certificates
+        })
+    finally:
+        cur.close()
+        conn.close()
+
 @app.get("/student_certificates/{student_certificate_id}")
 async def get_student_certificate(student_certificate_id: int):
     conn = get_db_connection()
@@ -333,26 +781,49 @@ async def get_student_certificate(student_certificate_id: int):
 # LEADERBOARD APIs
 # -------------------------
 class LeaderboardEntry(BaseModel):
-    id: int
+    id: int = None
     student_id: int
     metric: str
     score: float = 0
     context: dict = None
 
+class LeaderboardIncrement(BaseModel):
+    student_id: int
+    metric: str
+    delta: float
+
+class LeaderboardIncrementBatch(BaseModel):
+    increments: list[LeaderboardIncrement]
+
+MAX_LEADERBOARD_INCREMENTS = 10000
+
+# Ranked per-metric views, patched by writes from this process
+leaderboard = Leaderboard()
+
+
 @app.post("/leaderboard/add")
 async def add_leaderboard_entry(entry: LeaderboardEntry):
+    """Set a student's score for a metric, replacing any existing entry"""
     logger.info(f"Adding leaderboard entry for student: {entry.student_id}, metric: {entry.metric}")
     conn = get_db_connection()
     cur = conn.cursor()
     try:
+        before = lock_version(cur)
         cur.execute("""
             INSERT INTO leaderboard_entries (id, student_id, metric, score, context)
-            VALUES (%s, %s, %s, %s, %s) RETURNING id;
+            VALUES (COALESCE(%s, nextval('leaderboard_entries_id_seq')), %s, %s, %s, %s)
+            ON CONFLICT (student_id, metric) DO UPDATE
+            SET score = EXCLUDED.score, context = EXCLUDED.context, updated_at = now()
+            RETURNING id, score, (xmax = 0) AS inserted;
         """, (entry.id, entry.student_id, entry.metric, entry.score, json.dumps(entry.context) if entry.context else None))
-        entry_id = cur.fetchone()[0]
+        entry_id, score, inserted = cur.fetchone()
+        # We hold our counter shard, so any other movement of the total is another writer's
+        after = current_versions(cur)
         conn.commit()
-        logger.info(f"Leaderboard entry added successfully: {entry.student_id}, id: {entry_id}")
-        return {"message": "Leaderboard entry added successfully", "entry_id": entry_id}
+        leaderboard.apply(before, after, [(entry.metric, entry.student_id, score)])
+        action = "added" if inserted else "updated"
+        logger.info(f"Leaderboard entry {action} successfully: {entry.student_id}, id: {entry_id}")
+        return {"message": f"Leaderboard entry {action} successfully", "entry_id": entry_id}
     except Exception as e:
         logger.error(f"Error adding leaderboard entry for student {entry.student_id}: {e}")
         conn.rollback()
@@ -361,6 +832,100 @@ async def add_leaderboard_entry(entry: LeaderboardEntry):
         cur.close()
         conn.close()
 
+@app.post("/leaderboard/increments")
+async def increment_leaderboard_scores(batch: LeaderboardIncrementBatch):
+    """Add score deltas for many (student_id, metric) pairs in one statement.
+
+    Deltas for the same pair are summed first; pairs without an entry start
+    from zero. The batch is applied atomically.
+    """
+    if len(batch.increments) > MAX_LEADERBOARD_INCREMENTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_LEADERBOARD_INCREMENTS} increments per batch")
+
+    deltas = {}
+    for increment in batch.increments:
+        key = (increment.student_id, increment.metric)
+        deltas[key] = deltas.get(key, 0) + increment.delta
+    if not deltas:
+        return {"message": "No increments to apply", "received": 0, "applied": 0, "entries": []}
+    # Apply rows in key order so concurrent batches lock entries consistently
+    keys = sorted(deltas)
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        before = lock_version(cur)
+        cur.execute("""
+            INSERT INTO leaderboard_entries AS e (student_id, metric, score)
+            SELECT * FROM unnest(%s::int[], %s::text[], %s::numeric[])
+            ON CONFLICT (student_id, metric) DO UPDATE
+            SET score = COALESCE(e.score, 0) + EXCLUDED.score, updated_at = now()
+            RETURNING student_id, metric, score;
+        """, ([student_id for student_id, _ in keys], [metric for _, metric in keys],
+              [deltas[key] for key in keys]))
+        entries = cur.fetchall()
+        after = current_versions(cur)
+        conn.commit()
+        leaderboard.apply(before, after, [(metric, student_id, score) for student_id, metric, score in entries])
+        logger.info(f"Applied {len(batch.increments)} leaderboard increments to {len(entries)} entries")
+        return FastJSONResponse({
+            "message": "Leaderboard increments applied successfully",
+            "received": len(batch.increments),
+            "applied": len(entries),
+            "entries": [
+                {"student_id": student_id, "metric": metric, "score": score}
+                for student_id, metric, score in entries
+            ]
+        })
+    except Exception as e:
+        logger.error(f"Error applying leaderboard increments: {e}")
+        conn.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        cur.close()
+        conn.close()
+
+@app.get("/leaderboard/{metric}/top")
+def get_leaderboard_top(metric: str, k: int = Query(10, ge=1, le=1000)):
+    """Highest scores for a metric with competition ranks (ties share a rank)"""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        total, entries = leaderboard.top(cur, metric, k)
+        return FastJSONResponse({"metric": metric, "total": total, "entries": entries})
+    finally:
+        cur.close()
+        conn.close()
+
+@app.get("/leaderboard/{metric}/rank/{student_id}")
+def get_leaderboard_rank(metric: str, student_id: int):
+    """A student's rank and percentile (share of entries at or below their score)"""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        standing = leaderboard.standing(cur, metric, student_id)
+        if standing is None:
+            raise HTTPException(status_code=404, detail="Student has no entry for this metric")
+        return {"metric": metric, **standing}
+    finally:
+        cur.close()
+        conn.close()
+
+@app.get("/leaderboard/{metric}/neighbors/{student_id}")
+def get_leaderboard_neighbors(metric: str, student_id: int, count: int = Query(5, ge=1, le=100)):
+    """Entries ranked just above and below a student"""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        result = leaderboard.neighbors(cur, metric, student_id, count)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Student has no entry for this metric")
+        standing, entries = result
+        return FastJSONResponse({"metric": metric, **standing, "neighbors": entries})
+    finally:
+        cur.close()
+        conn.close()
+
 @app.get("/leaderboard/{entry_id}")
 async def get_leaderboard_entry(entry_id: int):
     conn = get_db_connection()
@@ -381,39 +946,54 @@ async def get_leaderboard_entry(entry_id: int):
 # ALUMNI APIs
 # -------------------------
 class Alumni(BaseModel):
-    id: int
+    id: int = None
     student_id: int
     graduation_year: int
     current_status: str = None
 
+class AlumniBatch(BaseModel):
+    alumni: list[Alumni]
+
+MAX_ALUMNI_BATCH = 10000
+
+# Constraint names PostgreSQL gives the alumni table's inline constraints
+ALUMNI_STUDENT_FKEY = "alumni_student_id_fkey"
+ALUMNI_STUDENT_KEY = "alumni_student_id_key"
+ALUMNI_PKEY = "alumni_pkey"
+
+
+def alumni_violation_detail(e: psycopg2.Error, alumni: Alumni) -> str:
+    """Client-facing message for a constraint the alumni insert ran into"""
+    constraint = getattr(e.diag, "constraint_name", None)
+    if constraint == ALUMNI_STUDENT_FKEY:
+        return f"Student with ID {alumni.student_id} does not exist"
+    if constraint == ALUMNI_STUDENT_KEY:
+        return f"Student {alumni.student_id} is already registered as alumni"
+    if constraint == ALUMNI_PKEY:
+        return f"Alumni with ID {alumni.id} already exists"
+    return str(e)
+
+
 @app.post("/alumni/register")
 async def register_alumni(alumni: Alumni):
+    """Register a graduated student; the FK and unique constraints do the checks"""
     logger.info(f"Registering alumni for student: {alumni.student_id}")
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        # First check if student exists
-        cur.execute("SELECT id FROM students WHERE id = %s;", (alumni.student_id,))
-        if not cur.fetchone():
-            raise HTTPException(status_code=400, detail=f"Student with ID {alumni.student_id} does not exist")
-        
-        # Check if student is already registered as alumni
-        cur.execute("SELECT id FROM alumni WHERE student_id = %s;", (alumni.student_id,))
-        if cur.fetchone():
-            raise HTTPException(status_code=400, detail=f"Student {alumni.student_id} is already registered as alumni")
-        
-        # Insert new alumni record
         cur.execute("""
             INSERT INTO alumni (id, student_id, graduation_year, current_status)
-            VALUES (%s, %s, %s, %s) RETURNING id;
+            VALUES (COALESCE(%s, nextval('alumni_id_seq')), %s, %s, %s) RETURNING id;
         """, (alumni.id, alumni.student_id, alumni.graduation_year, alumni.current_status))
         alumni_id = cur.fetchone()[0]
         conn.commit()
         logger.info(f"Alumni registered successfully: {alumni.student_id}, id: {alumni_id}")
         return {"message": "Alumni registered successfully", "alumni_id": alumni_id}
-    except HTTPException:
+    except (psycopg2.errors.ForeignKeyViolation, psycopg2.errors.UniqueViolation) as e:
         conn.rollback()
-        raise
+        detail = alumni_violation_detail(e, alumni)
+        logger.warning(f"Alumni registration rejected for student {alumni.student_id}: {detail}")
+        raise HTTPException(status_code=400, detail=detail)
     except Exception as e:
         logger.error(f"Error registering alumni for student {alumni.student_id}: {e}")
         conn.rollback()
@@ -422,6 +1002,79 @@ async def register_alumni(alumni: Alumni):
         cur.close()
         conn.close()
 
+@app.post("/alumni/register/batch")
+def register_alumni_batch(batch: AlumniBatch):
+    """Register a whole graduating class in one statement and transaction.
+
+    Each row is reported as registered, already_alumni, student_not_found
+    or duplicate_in_batch (later entries for a student listed twice). Rows
+    that cannot be registered are skipped rather than failing the batch;
+    only an explicit id that is already taken rejects the whole batch.
+    """
+    if not batch.alumni:
+        raise HTTPException(status_code=400, detail="No alumni to register")
+    if len(batch.alumni) > MAX_ALUMNI_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_ALUMNI_BATCH} alumni per batch")
+
+    seen = set()
+    rows = []
+    for position, alumni in enumerate(batch.alumni):
+        if alumni.student_id not in seen:
+            seen.add(alumni.student_id)
+            rows.append((position, alumni.id, alumni.student_id, alumni.graduation_year, alumni.current_status))
+
+    logger.info(f"Registering {len(rows)} alumni in one batch")
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        outcomes = execute_values(cur, """
+            WITH input (pos, id, student_id, graduation_year, current_status) AS (VALUES %s),
+            registered AS (
+                INSERT INTO alumni (id, student_id, graduation_year, current_status)
+                SELECT COALESCE(i.id, nextval('alumni_id_seq')), i.student_id, i.graduation_year, i.current_status
+                FROM input i
+                JOIN students s ON s.id = i.student_id
+                ORDER BY i.student_id
+                ON CONFLICT (student_id) DO NOTHING
+                RETURNING id, student_id
+            )
+            SELECT i.pos, r.id, s.id IS NOT NULL
+            FROM input i
+            LEFT JOIN registered r ON r.student_id = i.student_id
+            LEFT JOIN students s ON s.id = i.student_id;
+        """, rows, template="(%s::int, %s::int, %s::int, %s::int, %s::text)", page_size=len(rows), fetch=True)
+        conn.commit()
+    except psycopg2.errors.UniqueViolation as e:
+        conn.rollback()
+        detail = str(e).strip()
+        if getattr(e.diag, "constraint_name", None) == ALUMNI_PKEY:
+            detail = f"An alumni id in the batch is already taken: {getattr(e.diag, 'message_detail', '')}"
+        logger.warning(f"Alumni batch rejected: {detail}")
+        raise HTTPException(status_code=400, detail=detail)
+    except Exception as e:
+        logger.error(f"Error registering alumni batch: {e}")
+        conn.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        cur.close()
+        conn.close()
+
+    report = [{"student_id": alumni.student_id, "status": "duplicate_in_batch"} for alumni in batch.alumni]
+    for position, alumni_id, student_exists in outcomes:
+        entry = report[position]
+        if alumni_id is not None:
+            entry.update(status="registered", alumni_id=alumni_id)
+        else:
+            entry["status"] = "already_alumni" if student_exists else "student_not_found"
+    registered = sum(1 for entry in report if entry["status"] == "registered")
+    logger.info(f"Alumni batch registered {registered} of {len(batch.alumni)}")
+    return FastJSONResponse({
+        "message": "Alumni batch processed",
+        "received": len(batch.alumni),
+        "registered": registered,
+        "results": report
+    })
+
 @app.get("/alumni/{alumni_id}")
 async def get_alumni(alumni_id: int):
     conn = get_db_connection()
@@ -489,6 +1142,139 @@ async def get_feedback(feedback_id: int):
         conn.close()
 
 
+# Feedback analytics are read from feedback_rollups (one row per target per
+# day, maintained by triggers), never from the feedbacks table itself
+ROLLUP_SUMS = """SUM(feedback_count), SUM(rating_count), SUM(rating_sum),
+                 SUM(rating_1), SUM(rating_2), SUM(rating_3), SUM(rating_4), SUM(rating_5)"""
+FEEDBACK_TARGET_ORDER = {
+    "feedback_count": "SUM(feedback_count) DESC",
+    "average_rating": "SUM(rating_sum)::numeric / NULLIF(SUM(rating_count), 0) DESC NULLS LAST, "
+                      "SUM(feedback_count) DESC",
+}
+
+
+def rating_stats(row) -> dict:
+    """Turn the eight ROLLUP_SUMS columns into counts, average and distribution"""
+    feedback_count, rating_count, rating_sum, *distribution = (int(value or 0) for value in row)
+    return {
+        "feedback_count": feedback_count,
+        "rating_count": rating_count,
+        "average_rating": round(rating_sum / rating_count, 2) if rating_count else None,
+        "distribution": {str(rating): count for rating, count in enumerate(distribution, start=1)}
+    }
+
+
+def rollup_window(from_date: date = None, to_date: date = None):
+    """SQL conditions and params for an inclusive day window"""
+    conditions, params = [], []
+    if from_date:
+        conditions.append("day >= %s")
+        params.append(from_date)
+    if to_date:
+        conditions.append("day <= %s")
+        params.append(to_date)
+    return conditions, params
+
+
+def target_feedback_analytics(request: Request, target_type: str, target_id: int,
+                              from_date: date, to_date: date, interval: str):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        etag = list_etag(cur, request, "feedbacks")
+        cached = etag and not_modified(request, etag)
+        if cached:
+            return cached
+
+        conditions, params = rollup_window(from_date, to_date)
+        cur.execute(f"""
+            SELECT date_trunc(%s, day)::date AS period, {ROLLUP_SUMS}
+            FROM feedback_rollups
+            WHERE {' AND '.join(["target_type = %s", "target_id = %s"] + conditions)}
+            GROUP BY 1
+            ORDER BY 1;
+        """, [interval, target_type, target_id] + params)
+        rows = cur.fetchall()
+
+        totals = [sum(int(row[i] or 0) for row in rows) for i in range(1, 9)]
+        return with_etag(FastJSONResponse({
+            "target_type": target_type,
+            "target_id": target_id,
+            "from_date": from_date,
+            "to_date": to_date,
+            "interval": interval,
+            **rating_stats(totals),
+            "series": [{"period": row[0], **rating_stats(row[1:])} for row in rows]
+        }), etag)
+    finally:
+        cur.close()
+        conn.close()
+
+
+@app.get("/feedbacks/analytics/targets/{target_type}")
+def get_feedback_analytics_by_target(
+    request: Request,
+    target_type: str,
+    from_date: date = None,
+    to_date: date = None,
+    order_by: str = Query("feedback_count", pattern="^(feedback_count|average_rating)$"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Counts and average rating for every target of a type within a window"""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        etag = list_etag(cur, request, "feedbacks")
+        cached = etag and not_modified(request, etag)
+        if cached:
+            return cached
+
+        conditions, params = rollup_window(from_date, to_date)
+        cur.execute(f"""
+            SELECT target_id, {ROLLUP_SUMS}
+            FROM feedback_rollups
+            WHERE {' AND '.join(["target_type = %s"] + conditions)}
+            GROUP BY target_id
+            HAVING SUM(feedback_count) > 0
+            ORDER BY {FEEDBACK_TARGET_ORDER[order_by]}, target_id
+            LIMIT %s;
+        """, [target_type] + params + [limit])
+        targets = [{"target_id": row[0], **rating_stats(row[1:])} for row in cur.fetchall()]
+        return with_etag(FastJSONResponse({
+            "target_type": target_type,
+            "from_date": from_date,
+            "to_date": to_date,
+            "count": len(targets),
+            "targets": targets
+        }), etag)
+    finally:
+        cur.close()
+        conn.close()
+
+@app.get("/feedbacks/analytics/targets/{target_type}/{target_id}")
+def get_feedback_analytics_for_target(
+    request: Request,
+    target_type: str,
+    target_id: int,
+    from_date: date = None,
+    to_date: date = None,
+    interval: str = Query("day", pattern="^(day|week|month)$")
+):
+    """Average rating, distribution and counts for one target, bucketed over time"""
+    return target_feedback_analytics(request, target_type, target_id, from_date, to_date, interval)
+
+@app.get("/feedbacks/analytics/mentors/{mentor_id}")
+def get_mentor_feedback_analytics(
+    request: Request,
+    mentor_id: int,
+    from_date: date = None,
+    to_date: date = None,
+    interval: str = Query("day", pattern="^(day|week|month)$")
+):
+    """Feedback analytics for a mentor (feedback with target_type 'mentor')"""
+    return target_feedback_analytics(request, "mentor", mentor_id, from_date, to_date, interval)
+
+
 # -------------------------
 # DATABASE MANAGEMENT APIs
 # -------------------------
@@ -522,218 +1308,273 @@ async def get_database_info():
         conn.close()
 
 @app.get("/admin/tables", tags=["Database Management"])
-async def list_all_tables():
-    """List all tables in the database with row counts"""
+def list_all_tables(exact: bool = False):
+    """List all tables in the database with row counts (estimated unless exact=true)"""
+    counts = table_statistics.table_counts(exact=exact)
+    return {
+        "total_tables": len(counts),
+        "counts_are_estimates": not exact,
+        "tables": [{"table_name": table, "row_count": count} for table, count in counts.items()]
+    }
+
+# Columns the admin listings may return; password_hash is never exposed
+LISTING_FIELDS = {
+    "students": ("id", "email", "full_name", "phone", "batch_year", "department", "status",
+                 "created_at", "updated_at"),
+    "mentors": ("id", "email", "full_name", "phone", "title", "expertise", "available",
+                "created_at", "updated_at"),
+    "events": ("id", "title", "description", "starts_at", "ends_at", "location", "metadata",
+               "created_by", "created_at", "capacity", "participant_count"),
+}
+
+
+def parse_fields(table: str, fields: str = None):
+    """Validate a comma separated column projection; id is always included"""
+    allowed = LISTING_FIELDS[table]
+    if not fields:
+        return list(allowed)
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields for {table}: {', '.join(unknown)}")
+    if "id" not in selected:
+        selected.insert(0, "id")
+    return selected
+
+
+def list_table_page(request: Request, table: str, fields: str, after_id: int, limit: int):
+    """Keyset-paginated listing of ``table`` ordered by id.
+
+    Pass the returned next_after_id back as after_id to fetch the next page;
+    it is null on the last page.
+    """
+    columns = parse_fields(table, fields)
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        # Get all table names
-        cur.execute("""
-            SELECT table_name 
-            FROM information_schema.tables 
-            WHERE table_schema = 'public' 
-            AND table_type = 'BASE TABLE'
-            ORDER BY table_name;
-        """)
-        tables = [row[0] for row in cur.fetchall()]
-        
-        # Get row count for each table
-        table_info = []
-        for table in tables:
-            cur.execute(f"SELECT COUNT(*) FROM {table};")
-            count = cur.fetchone()[0]
-            table_info.append({
-                "table_name": table,
-                "row_count": count
-            })
-        
-        return {
-            "total_tables": len(tables),
-            "tables": table_info
-        }
+        etag = list_etag(cur, request, table)
+        cached = etag and not_modified(request, etag)
+        if cached:
+            return cached
+
+        # Fetch one extra row to learn whether another page exists
+        if after_id is None:
+            cur.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY id LIMIT %s;", (limit + 1,))
+        else:
+            cur.execute(
+                f"SELECT {', '.join(columns)} FROM {table} WHERE id > %s ORDER BY id LIMIT %s;",
+                (after_id, limit + 1)
+            )
+        rows = cur.fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        items = [dict(zip(columns, row)) for row in rows]
+
+        return with_etag(FastJSONResponse({
+            f"total_{table}": table_statistics.table_counts().get(table, 0),
+            "total_is_estimate": True,
+            "count": len(items),
+            "next_after_id": items[-1]["id"] if has_more else None,
+            table: items
+        }), etag)
     finally:
         cur.close()
         conn.close()
 
+
 @app.get("/admin/students/all", tags=["Database Management"])
-async def view_all_students():
-    """View all students in the database"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    try:
-        cur.execute("SELECT * FROM students ORDER BY id;")
-        students = cur.fetchall()
-        columns = [desc[0] for desc in cur.description]
-        return {
-            "total_students": len(students),
-            "students": [dict(zip(columns, student)) for student in students]
-        }
-    finally:
-        cur.close()
-        conn.close()
+def view_all_students(
+    request: Request,
+    after_id: int = None,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: str = None
+):
+    """View students a page at a time (keyset pagination on id)"""
+    return list_table_page(request, "students", fields, after_id, limit)
 
 @app.get("/admin/mentors/all", tags=["Database Management"])
-async def view_all_mentors():
-    """View all mentors in the database"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    try:
-        cur.execute("SELECT * FROM mentors ORDER BY id;")
-        mentors = cur.fetchall()
-        columns = [desc[0] for desc in cur.description]
-        return {
-            "total_mentors": len(mentors),
-            "mentors": [dict(zip(columns, mentor)) for mentor in mentors]
-        }
-    finally:
-        cur.close()
-        conn.close()
+def view_all_mentors(
+    request: Request,
+    after_id: int = None,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: str = None
+):
+    """View mentors a page at a time (keyset pagination on id)"""
+    return list_table_page(request, "mentors", fields, after_id, limit)
 
 @app.get("/admin/events/all", tags=["Database Management"])
-async def view_all_events():
-    """View all events in the database"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    try:
-        cur.execute("SELECT * FROM events ORDER BY id;")
-        events = cur.fetchall()
-        columns = [desc[0] for desc in cur.description]
-        return {
-            "total_events": len(events),
-            "events": [dict(zip(columns, event)) for event in events]
-        }
-    finally:
-        cur.close()
-        conn.close()
+def view_all_events(
+    request: Request,
+    after_id: int = None,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: str = None
+):
+    """View events a page at a time (keyset pagination on id)"""
+    return list_table_page(request, "events", fields, after_id, limit)
+
+STATISTICS_TABLES = ['students', 'mentors', 'events', 'student_certificates', 'leaderboard_entries', 'alumni', 'feedbacks']
 
 @app.get("/admin/statistics", tags=["Database Management"])
-async def get_database_statistics():
-    """Get comprehensive database statistics"""
-    try:
-        # Use a completely fresh connection with explicit isolation
-        conn = psycopg2.connect(
-            host=os.getenv("DATABASE_HOST", "localhost"),
-            database=os.getenv("DATABASE_NAME", "studentmanagement"),
-            user=os.getenv("DATABASE_USER", "postgres"),
-            password=os.getenv("DATABASE_PASSWORD", "Priya@0572"),
-            port=os.getenv("DATABASE_PORT", "5432")
-        )
-        conn.autocommit = True  # Use autocommit for this specific connection
-        
-        stats = {}
-        
-        # Count records in each table
-        tables = ['students', 'mentors', 'events', 'student_certificates', 'leaderboard_entries', 'alumni', 'feedbacks']
-        
-        with conn.cursor() as cur:
-            for table in tables:
-                try:
-                    cur.execute(f"SELECT COUNT(*) FROM {table};")
-                    stats[f"{table}_count"] = cur.fetchone()[0]
-                except Exception as e:
-                    print(f"Error counting {table}: {e}")  # Use print instead of logger
-                    stats[f"{table}_count"] = 0
-            
-            # Get recent activity (last 5 students)
-            try:
-                cur.execute("SELECT id, full_name, email FROM students ORDER BY id DESC LIMIT 5;")
-                recent_students = cur.fetchall()
-                columns = [desc[0] for desc in cur.description]
-                stats["recent_students"] = [dict(zip(columns, student)) for student in recent_students]
-            except Exception as e:
-                print(f"Error getting recent students: {e}")  # Use print instead of logger
-                stats["recent_students"] = []
-        
-        conn.close()
-        
+def get_database_statistics(exact: bool = False):
+    """Get database statistics (estimated counts unless exact=true, cached briefly)"""
+    try:
+        counts = table_statistics.table_counts(exact=exact)
+        stats = {f"{table}_count": counts.get(table, 0) for table in STATISTICS_TABLES}
+
+        # Recent activity (last 5 students) is a primary key index scan
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT id, full_name, email FROM students ORDER BY id DESC LIMIT 5;")
+            recent_students = cur.fetchall()
+            columns = [desc[0] for desc in cur.description]
+            stats["recent_students"] = [dict(zip(columns, student)) for student in recent_students]
+        except Exception as e:
+            logger.error(f"Error getting recent students: {e}")
+            stats["recent_students"] = []
+        finally:
+            cur.close()
+            conn.close()
+
         return {
             "database_statistics": stats,
+            "counts_are_estimates": not exact,
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
         }
-        
+
     except Exception as e:
-        print(f"Database connection error: {e}")  # Use print instead of logger
+        logger.error(f"Database connection error: {e}")
         return {
             "database_statistics": {
-                "students_count": 0,
-                "mentors_count": 0,
-                "events_count": 0,
-                "student_certificates_count": 0,
-                "leaderboard_entries_count": 0,
-                "alumni_count": 0,
-                "feedbacks_count": 0,
+                **{f"{table}_count": 0 for table in STATISTICS_TABLES},
                 "recent_students": []
             },
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
             "error": "Database connection failed"
         }
 
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input only matches literally"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def query_students(cur, q: str = None, prefix: bool = False, department: str = None,
+                   status: str = None, batch_year: int = None, limit: int = 20, offset: int = 0):
+    """Run an indexed student search and return (students, has_more).
+
+    Filters on department/status/batch_year are exact matches. ``q`` matches
+    names and emails as a substring (trigram indexes, ranked by similarity) or,
+    with ``prefix``, as a case-insensitive prefix for typeahead. Terms shorter
+    than three characters always use prefix matching, since trigrams cannot
+    narrow them down.
+    """
+    columns = LISTING_FIELDS["students"]
+    where_conditions = []
+    params = []
+    order_by = "batch_year DESC NULLS LAST, full_name, id"
+
+    if department:
+        where_conditions.append("department = %s")
+        params.append(department)
+    if batch_year:
+        where_conditions.append("batch_year = %s")
+        params.append(batch_year)
+    if status:
+        where_conditions.append("status = %s")
+        params.append(status)
+
+    select_params = []
+    if q:
+        if prefix or len(q) < 3:
+            pattern = escape_like(q.lower()) + "%"
+            where_conditions.append("(lower(full_name) LIKE %s OR lower(email) LIKE %s)")
+            params.extend([pattern, pattern])
+            order_by = "lower(full_name), id"
+        else:
+            pattern = f"%{escape_like(q)}%"
+            where_conditions.append("(full_name ILIKE %s OR email ILIKE %s)")
+            params.extend([pattern, pattern])
+            order_by = "rank DESC, id"
+        select_params = [q, q]
+
+    rank = "GREATEST(similarity(full_name, %s), similarity(email, %s))" if q else "1.0"
+    where_clause = " AND ".join(where_conditions) if where_conditions else "TRUE"
+
+    # Fetch one extra row to learn whether another page exists
+    cur.execute(f"""
+        SELECT {', '.join(columns)}, {rank} AS rank
+        FROM students
+        WHERE {where_clause}
+        ORDER BY {order_by}
+        LIMIT %s OFFSET %s;
+    """, select_params + params + [limit + 1, offset])
+    rows = cur.fetchall()
+    students = [dict(zip(columns + ("rank",), row)) for row in rows[:limit]]
+    return students, len(rows) > limit
+
+
+@app.get("/admin/search/students", tags=["Database Management"])
+def search_students_ranked(
+    q: str = Query(..., min_length=1),
+    prefix: bool = False,
+    department: str = None,
+    status: str = None,
+    batch_year: int = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Ranked, paginated student search by name or email (prefix=true for typeahead)"""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        students, has_more = query_students(cur, q, prefix, department, status, batch_year, limit, offset)
+        return FastJSONResponse({
+            "q": q,
+            "prefix": prefix,
+            "results_found": len(students),
+            "has_more": has_more,
+            "next_offset": offset + limit if has_more else None,
+            "students": students
+        })
+    finally:
+        cur.close()
+        conn.close()
+
 @app.get("/admin/search/students/{search_term}", tags=["Database Management"])
-async def search_students(search_term: str):
+def search_students(search_term: str, limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
     """Search students by name or email"""
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        cur.execute("""
-            SELECT * FROM students 
-            WHERE full_name ILIKE %s OR email ILIKE %s 
-            ORDER BY id;
-        """, (f"%{search_term}%", f"%{search_term}%"))
-        students = cur.fetchall()
-        columns = [desc[0] for desc in cur.description]
-        return {
+        students, has_more = query_students(cur, search_term, limit=limit, offset=offset)
+        return FastJSONResponse({
             "search_term": search_term,
             "results_found": len(students),
-            "students": [dict(zip(columns, student)) for student in students]
-        }
+            "has_more": has_more,
+            "students": students
+        })
     finally:
         cur.close()
         conn.close()
 
 @app.get("/admin/students/filter", tags=["Database Management"])
-async def filter_students(
+def filter_students(
     department: str = None,
     batch_year: int = None,
     status: str = None,
-    search: str = None
+    search: str = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
 ):
-    """Filter students by department, batch year, status, or search term"""
+    """Filter students by exact department, batch year and status, plus an optional search term"""
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        # Build dynamic query
-        where_conditions = []
-        params = []
-        
-        if department:
-            where_conditions.append("department ILIKE %s")
-            params.append(f"%{department}%")
-            
-        if batch_year:
-            where_conditions.append("batch_year = %s")
-            params.append(batch_year)
-            
-        if status:
-            where_conditions.append("status ILIKE %s")
-            params.append(f"%{status}%")
-            
-        if search:
-            where_conditions.append("(full_name ILIKE %s OR email ILIKE %s)")
-            params.extend([f"%{search}%", f"%{search}%"])
-        
-        where_clause = " AND ".join(where_conditions) if where_conditions else "1=1"
-        
-        query = f"""
-            SELECT * FROM students 
-            WHERE {where_clause}
-            ORDER BY batch_year DESC, full_name;
-        """
-        
-        cur.execute(query, params)
-        students = cur.fetchall()
-        columns = [desc[0] for desc in cur.description]
-        
-        return {
+        students, has_more = query_students(
+            cur, search, department=department, status=status, batch_year=batch_year,
+            limit=limit, offset=offset
+        )
+        return FastJSONResponse({
             "filters": {
                 "department": department,
                 "batch_year": batch_year,
@@ -741,47 +1582,96 @@ async def filter_students(
                 "search": search
             },
             "results_found": len(students),
-            "students": [dict(zip(columns, student)) for student in students]
-        }
+            "has_more": has_more,
+            "students": students
+        })
+    finally:
+        cur.close()
+        conn.close()
+
+# Facet lists, rebuilt from student_facet_counts only when the students change counter moves
+_facet_cache = (None, None)
+
+
+def load_student_facets(cur):
+    """Return (version, facets) for department, batch_year and status.
+
+    The students change counter is checked on every call (a sum over its
+    shard rows); the facet rows are re-read only when it has moved since the
+    cached copy was built.
+    """
+    global _facet_cache
+    cur.execute("SELECT COALESCE(SUM(version), 0)::BIGINT FROM change_counters WHERE table_name = 'students';")
+    version = cur.fetchone()[0]
+
+    cached_version, facets = _facet_cache
+    if facets is not None and cached_version == version:
+        return version, facets
+
+    cur.execute("SELECT facet, value, count FROM student_facet_counts;")
+    facets = {"departments": [], "batch_years": [], "statuses": []}
+    keys = {"department": "departments", "batch_year": "batch_years", "status": "statuses"}
+    for facet, value, count in cur.fetchall():
+        facets[keys[facet]].append({
+            "value": int(value) if facet == "batch_year" else value,
+            "count": count
+        })
+    facets["departments"].sort(key=lambda item: item["value"])
+    facets["batch_years"].sort(key=lambda item: item["value"], reverse=True)
+    facets["statuses"].sort(key=lambda item: item["value"])
+
+    _facet_cache = (version, facets)
+    return version, facets
+
+
+@app.get("/admin/students/facets", tags=["Database Management"])
+def get_student_facets(request: Request):
+    """Departments, batch years and statuses with per-value student counts"""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        version, facets = load_student_facets(cur)
+        etag = make_etag(request.url.path, version)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        return with_etag(FastJSONResponse(facets), etag)
     finally:
         cur.close()
         conn.close()
 
 @app.get("/admin/students/departments", tags=["Database Management"])
-async def get_student_departments():
+def get_student_departments():
     """Get all unique departments"""
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        cur.execute("SELECT DISTINCT department FROM students WHERE department IS NOT NULL ORDER BY department;")
-        departments = [row[0] for row in cur.fetchall()]
-        return {"departments": departments}
+        _, facets = load_student_facets(cur)
+        return {"departments": [item["value"] for item in facets["departments"]]}
     finally:
         cur.close()
         conn.close()
 
 @app.get("/admin/students/batch-years", tags=["Database Management"])
-async def get_student_batch_years():
+def get_student_batch_years():
     """Get all unique batch years"""
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        cur.execute("SELECT DISTINCT batch_year FROM students WHERE batch_year IS NOT NULL ORDER BY batch_year DESC;")
-        batch_years = [row[0] for row in cur.fetchall()]
-        return {"batch_years": batch_years}
+        _, facets = load_student_facets(cur)
+        return {"batch_years": [item["value"] for item in facets["batch_years"]]}
     finally:
         cur.close()
         conn.close()
 
 @app.get("/admin/students/statuses", tags=["Database Management"])
-async def get_student_statuses():
+def get_student_statuses():
     """Get all unique student statuses"""
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        cur.execute("SELECT DISTINCT status FROM students WHERE status IS NOT NULL ORDER BY status;")
-        statuses = [row[0] for row in cur.fetchall()]
-        return {"statuses": statuses}
+        _, facets = load_student_facets(cur)
+        return {"statuses": [item["value"] for item in facets["statuses"]]}
     finally:
         cur.close()
         conn.close()
@@ -0,0 +1,34 @@
+"""CSV records are parsed across lines and chunk boundaries."""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_import import iter_records
+
+
+def records(body: str, chunk_size: int = 5):
+    async def chunks():
+        data = body.encode("utf-8")
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+
+    async def collect():
+        return [pair async for pair in iter_records(chunks(), "csv", ("expertise",))]
+
+    return asyncio.run(collect())
+
+
+def test_quoted_field_spans_lines():
+    body = 'email,bio,expertise\r\na@x.io,"first\r\n\r\nsecond ""quoted""",ml; nlp\r\nb@x.io,plain,\r\n'
+    assert records(body) == [
+        (1, {"email": "a@x.io", "bio": 'first\n\nsecond "quoted"', "expertise": ["ml", "nlp"]}),
+        (2, {"email": "b@x.io", "bio": "plain"}),
+    ]
+
+
+def test_bad_rows_are_reported_not_raised():
+    rows = records('email,bio\nshort\nc@x.io,"never closed\n')
+    assert [row for row, _ in rows] == [1, 2]
+    assert all(isinstance(error, ValueError) for _, error in rows)
@@ -0,0 +1,90 @@
+"""Leaderboard boards are patched in place by this process's own writes."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import Leaderboard, RankedBoard
+
+
+class FakeCursor:
+    """Answers the two queries Leaderboard issues from an in-memory table"""
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.rows = rows
+        self.loads = 0
+        self._result = None
+
+    def execute(self, sql, params=None):
+        if "LEFT JOIN leaderboard_entries" in sql:
+            self.loads += 1
+            ordered = sorted(self.rows, key=lambda row: (-row[1], row[0]))
+            self._result = [(self.version, sid, score) for sid, score in ordered] or [(self.version, None, None)]
+        else:
+            # Only the board's total is read through the cursor in these tests
+            self._result = [(self.version, 0)]
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return self._result
+
+
+def test_own_upsert_patches_board_without_reload():
+    cur = FakeCursor(version=4, rows=[(1, 10.0), (2, 20.0)])
+    leaderboard = Leaderboard()
+    assert leaderboard.top(cur, "points", 10)[1][0]["student_id"] == 2
+    assert cur.loads == 1
+
+    # An upsert fires both the INSERT and UPDATE statement triggers on our
+    # shard: total 4 -> 6, own shard 1 -> 3
+    cur.version = 6
+    cur.rows.append((3, 30.0))
+    leaderboard.apply((4, 1), (6, 3), [("points", 3, 30.0)])
+
+    total, top = leaderboard.top(cur, "points", 10)
+    assert cur.loads == 1
+    assert total == 3
+    assert [entry["student_id"] for entry in top] == [3, 2, 1]
+
+
+def test_write_committed_on_another_shard_forces_reload():
+    cur = FakeCursor(version=4, rows=[(1, 10.0)])
+    leaderboard = Leaderboard()
+    leaderboard.top(cur, "points", 10)
+
+    # Our shard moved by 2 but the total by 4: someone else committed meanwhile
+    cur.version = 8
+    cur.rows.extend([(2, 5.0), (3, 7.0)])
+    leaderboard.apply((4, 0), (8, 2), [("points", 2, 5.0)])
+
+    total, _ = leaderboard.top(cur, "points", 10)
+    assert cur.loads == 2
+    assert total == 3
+
+
+def test_foreign_write_before_ours_forces_reload():
+    cur = FakeCursor(version=4, rows=[(1, 10.0)])
+    leaderboard = Leaderboard()
+    leaderboard.top(cur, "points", 10)
+
+    # Another writer got in first: the board is not at our "before" total
+    cur.version = 8
+    cur.rows.append((2, 5.0))
+    leaderboard.apply((6, 0), (8, 2), [("points", 2, 5.0)])
+
+    total, _ = leaderboard.top(cur, "points", 10)
+    assert cur.loads == 2
+    assert total == 2
+
+
+def test_ranks_and_neighbors():
+    board = RankedBoard(1, [(1, 50), (2, 40), (3, 40), (4, 10)])
+    assert board.standing(3)["rank"] == 2
+    board.set_score(4, 60)
+    assert board.top(1)[0]["student_id"] == 4
+    standing, around = board.neighbors(2, 1)
+    assert standing["rank"] == 3
+    assert [entry["student_id"] for entry in around] == [1, 2, 3]